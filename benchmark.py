@@ -0,0 +1,149 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+
+import mc_json_helper
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+mix = [
+    ('block/cube_all', 35),
+    ('item/generated', 25),
+    ('block/orientable', 10),
+    ('block/stairs', 10),
+    ('block/slab', 10),
+    ('block/wall', 10)
+]
+langs = {'en_us': '{title}', 'pt_br': '{title} (pt)', 'de_de': '{title} (de)'}
+
+
+def synthesize(path, count, modid='bench', seed=0):
+    rng = random.Random(seed)
+    parents = [parent for parent, weight in mix for _ in range(weight)]
+    origin_blocks = []
+    with open(path, 'w') as json_file:
+        json_file.write('{\n  "modid": %s,\n  "entries": [\n' % json.dumps(modid))
+        for index in range(count):
+            parent = rng.choice(parents)
+            if parent in ('block/stairs', 'block/slab', 'block/wall') and not origin_blocks:
+                parent = 'block/cube_all'
+            name = '{kind}_{index}'.format(kind=parent.split('/')[1], index=index)
+            title = name.replace('_', ' ').title()
+            entry = {
+                'parent': parent,
+                'name': name,
+                'lang': {lang: text.format(title=title) for lang, text in langs.items()}
+            }
+            if parent in ('block/stairs', 'block/slab', 'block/wall'):
+                entry['origin_block'] = rng.choice(origin_blocks)
+            elif parent == 'block/cube_all':
+                origin_blocks.append(name)
+            json_file.write('    ' + json.dumps(entry) + (',\n' if index < count - 1 else '\n'))
+        json_file.write('  ]\n}\n')
+
+
+def tree_size(path):
+    files = 0
+    size = 0
+    if os.path.isfile(path):
+        return 1, os.path.getsize(path)
+    for root, dirs, names in os.walk(path):
+        for name in names:
+            files += 1
+            size += os.path.getsize(os.path.join(root, name))
+    return files, size
+
+
+def peak_memory():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def run_one(count, options, work_dir):
+    input_path = os.path.join(work_dir, 'input.json')
+    output_root = os.path.join(work_dir, 'out')
+    synthesize(input_path, count)
+
+    start = time.perf_counter()
+    result = mc_json_helper.generate(input_path, output_root, options)
+    seconds = time.perf_counter() - start
+    files, size = tree_size(output_root)
+
+    return {
+        'entries': result.entries,
+        'seconds': seconds,
+        'entries_per_second': result.entries / seconds if seconds else None,
+        'files_written': result.files_written,
+        'files_per_second': result.files_written / seconds if seconds else None,
+        'output_files': files,
+        'bytes_written': size,
+        'peak_memory_bytes': peak_memory(),
+        'phases': result.profile['phases'],
+        'by_type': result.profile['kinds']
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark mc_json_helper on synthetic inputs')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='number of entries of each synthetic input (default: 1000 10000 100000)')
+    parser.add_argument('-j', '--jobs', type=int, default=1)
+    parser.add_argument('--encoder', default='json')
+    parser.add_argument('--minify', action='store_true')
+    parser.add_argument('--zip', action='store_true', help='write a zip archive instead of a tree')
+    parser.add_argument('-o', '--output', default='benchmark_results.json',
+                        help='file the results are written to (default: benchmark_results.json)')
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--work-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    options = mc_json_helper.Options(jobs=args.jobs, encoder=args.encoder, minify=args.minify,
+                                     zip='pack.zip' if args.zip else None, profile=True)
+    if args.run_one is not None:
+        json.dump(run_one(args.run_one, options, args.work_dir), sys.stdout)
+        return
+
+    runs = []
+    for count in args.sizes:
+        work_dir = tempfile.mkdtemp(prefix='mc_json_helper_bench_')
+        try:
+            command = [sys.executable, os.path.abspath(__file__), '--run-one', str(count),
+                       '--work-dir', work_dir, '--jobs', str(args.jobs), '--encoder', args.encoder]
+            if args.minify:
+                command.append('--minify')
+            if args.zip:
+                command.append('--zip')
+            output = subprocess.check_output(command)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        run = json.loads(output)
+        runs.append(run)
+        print('{entries:>7} entries  {seconds:8.3f}s  {entries_per_second:10.0f} entries/s  '
+              '{files_per_second:10.0f} files/s  {bytes_written:>12} bytes'.format(**run))
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {key: value for key, value in vars(options).items() if key not in ('profile_callback', 'memory_callback')},
+        'runs': runs
+    }
+    with open(args.output, 'w') as json_file:
+        json.dump(results, json_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
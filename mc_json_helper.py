@@ -1,47 +1,1693 @@
 import os
+import sys
 import json
+import time
+import heapq
+import shutil
+import asyncio
+import difflib
+import copy
+import marshal
+import hashlib
+import tempfile
+import argparse
+import zipfile
+import threading
+import tracemalloc
+from collections import deque, OrderedDict
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from itertools import islice, product
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+
+class JsonEncoder:
+    name = 'json'
+
+    def __init__(self, minify=False):
+        self.minify = minify
+
+    @property
+    def key(self):
+        return self.name + (':minify' if self.minify else '')
+
+    def dumps(self, json_data, sort_keys=False):
+        if self.minify:
+            return json.dumps(json_data, sort_keys=sort_keys, separators=(',', ':'))
+        return json.dumps(json_data, sort_keys=sort_keys, indent=2)
+
+    def escape(self, value):
+        return json.dumps(value)[1:-1]
+
+
+class OrjsonEncoder(JsonEncoder):
+    name = 'orjson'
+
+    def dumps(self, json_data, sort_keys=False):
+        option = 0 if self.minify else orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(json_data, option=option).decode('utf-8')
+
+    def escape(self, value):
+        return orjson.dumps(value).decode('utf-8')[1:-1]
+
+
+encoders = {'json': JsonEncoder, 'orjson': OrjsonEncoder}
+
+
+def get_encoder(name='json', minify=False):
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'json'
+    if name not in encoders:
+        raise ValueError('Unknown encoder {name}, expected one of {names}'.format(
+            name=name, names=', '.join(sorted(encoders))))
+    if name == 'orjson' and orjson is None:
+        raise ImportError('The orjson encoder needs the orjson package')
+    return encoders[name](minify)
+
+
+class Manifest:
+    version = 1
+    generator_hash = None
+
+    def __init__(self, path, root='.', settings=''):
+        self.path = path
+        self.root = root
+        self.settings = settings
+        if Manifest.generator_hash is None:
+            Manifest.generator_hash = Manifest.hash_file(__file__)
+        self.generator = Manifest.generator_hash
+        self.old_entries = {}
+        self.old_outputs = {}
+        self.old_shards = {}
+        self.old_modid = None
+        self.old_langs = {}
+        self.entries = {}
+        self.outputs = {}
+        self.shards = {}
+        self.modid = None
+        self.current = None
+        self.written = []
+
+        data = None
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as json_file:
+                    data = json.load(json_file)
+            except (OSError, ValueError):
+                data = None
+        if isinstance(data, dict) and data.get('version') == Manifest.version:
+            self.old_outputs = data.get('outputs', {})
+            for name, old in data.get('entries', {}).items():
+                self.old_langs[name] = old.get('langs', {})
+            if data.get('generator') == self.generator and data.get('settings') == self.settings:
+                self.old_entries = data.get('entries', {})
+                self.old_shards = data.get('shards', {})
+                self.old_modid = data.get('modid')
+
+    @staticmethod
+    def hash_text(text):
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def hash_file(path):
+        with open(path, 'rb') as source_file:
+            return hashlib.sha1(source_file.read()).hexdigest()
+
+    @staticmethod
+    def hash_entry(modid, entry):
+        if isinstance(entry, EntryRecord):
+            entry = entry.as_dict()
+        return Manifest.hash_text(json.dumps([modid, entry], sort_keys=True))
+
+    def is_fresh(self, name, entry_hash):
+        old = self.old_entries.get(name)
+        if not old or old.get('hash') != entry_hash:
+            return False
+        for path in old.get('outputs'):
+            if not self.is_intact(path):
+                return False
+        return True
+
+    def is_intact(self, path):
+        old = self.old_outputs.get(path)
+        if old is None:
+            return False
+        full_path = os.path.join(self.root, path)
+        try:
+            stat = os.stat(full_path)
+        except OSError:
+            return False
+        if stat.st_size != old[1]:
+            return False
+        if len(old) > 2 and stat.st_mtime_ns == old[2]:
+            return True
+        if Manifest.hash_file(full_path) != old[0]:
+            return False
+        self.old_outputs[path] = [old[0], old[1], stat.st_mtime_ns]
+        return True
+
+    def begin(self, name, entry_hash):
+        self.current = {'hash': entry_hash, 'outputs': [], 'langs': {}}
+        self.entries[name] = self.current
+
+    def end(self):
+        self.current = None
+
+    def reuse(self, name, add_langs=True):
+        old = self.old_entries.get(name)
+        self.entries[name] = old
+        for path in old.get('outputs'):
+            self.outputs[path] = self.old_outputs.get(path)
+        if SerialHelper.result is not None:
+            SerialHelper.result.files_unchanged += len(old.get('outputs'))
+        if add_langs:
+            for lang, lang_dict in old.get('langs').items():
+                SerialHelper.add_to_langs_dict(lang, dict(lang_dict))
+
+    def record_output(self, path, text):
+        digest = Manifest.hash_text(text)
+        if self.current is not None:
+            self.current['outputs'].append(path)
+        old = self.old_outputs.get(path)
+        if old is not None and old[0] == digest and self.is_intact(path):
+            self.outputs[path] = self.old_outputs[path]
+            return False
+        self.outputs[path] = [digest, len(text.encode('utf-8'))]
+        self.written.append(path)
+        return True
+
+    def stamp(self):
+        for path in self.written:
+            try:
+                stat = os.stat(os.path.join(self.root, path))
+            except OSError:
+                continue
+            self.outputs[path] = self.outputs[path][:2] + [stat.st_mtime_ns]
+        self.written = []
+
+    def record_lang(self, lang, lang_dict):
+        if self.current is not None:
+            self.current['langs'].setdefault(lang, {}).update(lang_dict)
+
+    def stale_outputs(self):
+        return sorted(path for path in self.old_outputs if path not in self.outputs)
+
+    def stale_langs(self):
+        for name, langs in self.old_langs.items():
+            if name in self.entries:
+                continue
+            for lang, lang_dict in langs.items():
+                yield lang, list(lang_dict)
+
+    def save(self):
+        data = {
+            'version': Manifest.version,
+            'generator': self.generator,
+            'settings': self.settings,
+            'modid': self.modid,
+            'entries': self.entries,
+            'outputs': self.outputs,
+            'shards': self.shards
+        }
+        temp_path = '{path}.{pid}.tmp'.format(path=self.path, pid=os.getpid())
+        try:
+            with open(temp_path, 'w') as json_file:
+                json_file.write(json.dumps(data, sort_keys=True))
+            os.replace(temp_path, self.path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class ManifestSet:
+    def __init__(self, manifests):
+        self.manifests = manifests
+        self.old_entries = manifests[0].old_entries
+
+    def is_fresh(self, name, entry_hash):
+        return all(manifest.is_fresh(name, entry_hash) for manifest in self.manifests)
+
+
+class CachedEntry(dict):
+    def __init__(self, name, source, shard):
+        super().__init__(name=name)
+        self.source = source
+        self.shard = shard
+
+    def load(self):
+        return self.source.load(self.shard, self.get('name'))
+
+
+class EntryRecord:
+    __slots__ = ('catalogue', 'index')
+
+    def __init__(self, catalogue, index):
+        self.catalogue = catalogue
+        self.index = index
+
+    def get(self, key, default=None):
+        catalogue = self.catalogue
+        if key == 'name':
+            value = catalogue.names[self.index]
+        elif key == 'parent':
+            value = catalogue.parents[self.index]
+        elif key == 'origin_block':
+            value = catalogue.origins[self.index]
+        elif key == 'lang':
+            value = catalogue.lang(self.index)
+        else:
+            value = catalogue.extras.get(self.index, {}).get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __reduce__(self):
+        return dict, (self.as_dict(),)
+
+    def as_dict(self):
+        entry = {}
+        for key in Catalogue.fields:
+            value = self.get(key)
+            if value is not None:
+                entry[key] = value
+        entry.update(self.catalogue.extras.get(self.index, {}))
+        return entry
+
+    def key(self):
+        return (self.get('parent'), self.get('origin_block'), tuple(sorted(self.get('lang').items())),
+                tuple(sorted(self.catalogue.extras.get(self.index, {}).items())))
+
+
+class Catalogue:
+    fields = ('parent', 'name', 'origin_block', 'lang')
+
+    def __init__(self, modid=None):
+        self.modid = sys.intern(modid) if isinstance(modid, str) else modid
+        self.names = []
+        self.parents = []
+        self.origins = []
+        self.langs = {}
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, entry):
+        index = len(self.names)
+        parent = entry.get('parent')
+        origin_block = entry.get('origin_block')
+        self.names.append(entry.get('name'))
+        self.parents.append(sys.intern(parent) if isinstance(parent, str) else parent)
+        self.origins.append(sys.intern(origin_block) if isinstance(origin_block, str) else origin_block)
+        lang = entry.get('lang')
+        if isinstance(lang, dict):
+            for code, text in lang.items():
+                column = self.langs.get(code)
+                if column is None:
+                    column = self.langs[sys.intern(code)] = [None] * index
+                column.append(text)
+        for column in self.langs.values():
+            if len(column) <= index:
+                column.append(None)
+        if len(entry) > len(Catalogue.fields) or any(key not in Catalogue.fields for key in entry):
+            self.extras[index] = {key: value for key, value in entry.items() if key not in Catalogue.fields}
+        return EntryRecord(self, index)
+
+    def lang(self, index):
+        return {code: column[index] for code, column in self.langs.items() if column[index] is not None}
+
+    def records(self):
+        for index in range(len(self.names)):
+            yield EntryRecord(self, index)
+
+    def index(self):
+        return {record.get('name'): record for record in self.records()}
+
+    def columns(self):
+        return self.modid, self.names, self.parents, self.origins, self.langs, self.extras
+
+    @staticmethod
+    def from_columns(columns):
+        catalogue = Catalogue()
+        catalogue.modid, catalogue.names, catalogue.parents, catalogue.origins, catalogue.langs, \
+            catalogue.extras = columns
+        return catalogue
+
+
+class InputCache:
+    version = 1
+
+    def __init__(self, path):
+        self.path = path
+        self.cache_path = os.path.join(os.path.dirname(path),
+                                       '.' + os.path.basename(path) + '.mc_json_helper_cache')
+
+    def key(self, stat, digest):
+        if Manifest.generator_hash is None:
+            Manifest.generator_hash = Manifest.hash_file(__file__)
+        return (InputCache.version, marshal.version, Manifest.generator_hash,
+                stat.st_size, stat.st_mtime_ns, digest)
+
+    def load(self, validate=True):
+        stat = os.stat(self.path)
+        data = self.read_cache(stat)
+        if data is None:
+            with open(self.path, 'rb') as input_file:
+                raw = input_file.read()
+            if self.path.endswith('.jsonl'):
+                header, entries = ShardedInput.parse_shard(self.path)
+            else:
+                document = json.loads(raw)
+                entries = document.get('entries', [])
+                header = {key: value for key, value in document.items() if key != 'entries'}
+            if validate:
+                Validator.run(header, entries)
+            catalogue = Catalogue(header.get('modid'))
+            for entry in entries:
+                catalogue.add(entry)
+            data = header, catalogue.columns(), validate
+            self.save(self.key(stat, hashlib.sha1(raw).hexdigest()), data)
+        header, columns, validated = data
+        catalogue = Catalogue.from_columns(columns)
+        if validate and not validated:
+            Validator.run(header, catalogue.records())
+        return header, catalogue
+
+    def read_cache(self, stat):
+        try:
+            with open(self.cache_path, 'rb') as cache_file:
+                key, data = marshal.loads(cache_file.read())
+            current = self.key(stat, None)
+            if key[:4] != current[:4]:
+                return None
+            if key[4] == current[4]:
+                return data
+            with open(self.path, 'rb') as input_file:
+                digest = hashlib.sha1(input_file.read()).hexdigest()
+            if digest != key[5]:
+                return None
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            return None
+        self.save(self.key(stat, digest), data)
+        return data
+
+    def save(self, key, data):
+        temp_path = '{path}.{pid}.tmp'.format(path=self.cache_path, pid=os.getpid())
+        try:
+            with open(temp_path, 'wb') as cache_file:
+                cache_file.write(marshal.dumps((key, data)))
+            os.replace(temp_path, self.cache_path)
+        except (OSError, ValueError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+
+class ShardedInput:
+    extensions = ('.json', '.jsonl')
+    header_names = ('header.json', '_header.json')
+
+    def __init__(self, path, jobs=1, keep=False):
+        self.path = path
+        self.jobs = jobs
+        self.keep = keep
+        self.cache = {}
+        self.records = {}
+
+    def shards(self):
+        shards = []
+        for root, dirs, names in os.walk(self.path):
+            dirs.sort()
+            for name in sorted(names):
+                if name.endswith(ShardedInput.extensions):
+                    full_path = os.path.join(root, name)
+                    stat = os.stat(full_path)
+                    relative = os.path.relpath(full_path, self.path).replace(os.sep, '/')
+                    shards.append((relative, full_path, [stat.st_size, stat.st_mtime_ns]))
+        shards.sort(key=lambda shard: (shard[0] not in ShardedInput.header_names, shard[0]))
+        return shards
+
+    def signature(self):
+        return tuple((relative, tuple(signature)) for relative, full_path, signature in self.shards())
+
+    @staticmethod
+    def parse_shard(path):
+        header = {}
+        entries = []
+        with open(path, 'r', encoding='utf-8') as json_file:
+            if path.endswith('.jsonl'):
+                for number, line in enumerate(json_file, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except ValueError as error:
+                        raise ValueError('{path}:{number}: {error}'.format(path=path, number=number, error=error))
+                    if 'name' not in item and 'modid' in item:
+                        header.update(item)
+                    else:
+                        entries.append(item)
+            else:
+                data = json.load(json_file)
+                if isinstance(data, list):
+                    entries = data
+                else:
+                    entries = data.get('entries', [])
+                    header = {key: value for key, value in data.items() if key != 'entries'}
+        return header, entries
+
+    def parse(self, shard):
+        relative, full_path, signature = shard
+        cached = self.cache.get(relative)
+        if cached is None or cached[0] != signature:
+            cached = (signature,) + ShardedInput.parse_shard(full_path)
+            self.cache[relative] = cached
+        return cached[1], cached[2]
+
+    def load(self, relative, name):
+        for shard in self.shards():
+            if shard[0] == relative:
+                for entry in self.parse(shard)[1]:
+                    if entry.get('name') == name:
+                        return entry
+        raise ValueError('Entry {name!r} disappeared from {shard}'.format(name=name, shard=relative))
+
+    def read(self, manifest=None):
+        shards = self.shards()
+        if not shards:
+            raise FileNotFoundError('No .json or .jsonl shards in {path}'.format(path=self.path))
+        header = {}
+        for shard in shards:
+            shard_header = self.parse(shard)[0]
+            header.update(shard_header)
+            if 'modid' in header:
+                break
+        return header, self.entries(shards, header, manifest)
+
+    def is_cached(self, shard, modid, manifest):
+        if manifest is None or manifest.old_modid != modid:
+            return False
+        old = manifest.old_shards.get(shard[0])
+        if old is None or old.get('signature') != shard[2]:
+            return False
+        return all(name in manifest.old_entries for name in old.get('names'))
+
+    def entries(self, shards, header, manifest=None):
+        modid = header.get('modid')
+        self.records = {}
+        pending = deque()
+        pool = None
+        if self.jobs > 1:
+            pool = ProcessPoolExecutor(max_workers=self.jobs)
+        try:
+            for shard in shards:
+                if self.is_cached(shard, modid, manifest):
+                    pending.append((shard, None))
+                elif pool is not None and self.cache.get(shard[0], (None,))[0] != shard[2]:
+                    pending.append((shard, pool.submit(ShardedInput.parse_shard, shard[1])))
+                else:
+                    pending.append((shard, False))
+                if len(pending) < self.jobs * 2:
+                    continue
+                for entry in self.drain(pending.popleft(), modid, manifest):
+                    yield entry
+            while pending:
+                for entry in self.drain(pending.popleft(), modid, manifest):
+                    yield entry
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    def drain(self, item, modid, manifest):
+        shard, future = item
+        relative = shard[0]
+        if future is None:
+            names = manifest.old_shards[relative]['names']
+            self.records[relative] = {'signature': shard[2], 'names': names}
+            for name in names:
+                yield CachedEntry(name, self, relative)
+            return
+        if future is False:
+            shard_header, entries = self.parse(shard)
+            if not self.keep:
+                del self.cache[relative]
+        else:
+            shard_header, entries = future.result()
+            if self.keep:
+                self.cache[relative] = (shard[2], shard_header, entries)
+        if shard_header.get('modid', modid) != modid:
+            raise ValueError('{shard} declares modid {modid!r}, expected {expected!r}'.format(
+                shard=relative, modid=shard_header.get('modid'), expected=modid))
+        self.records[relative] = {'signature': shard[2], 'names': [entry.get('name') for entry in entries]}
+        for entry in entries:
+            yield entry
+
+
+class Profiler:
+    def __init__(self, callback=None, trace_memory=False, memory_callback=None):
+        self.callback = callback
+        self.trace_memory = trace_memory or memory_callback is not None
+        self.memory_callback = memory_callback
+        self.phases = {}
+        self.kinds = {}
+        self.counters = {}
+        self.memory = []
+        self.started_tracing = False
+        self.lock = threading.Lock()
+
+    def record(self, phase, seconds, kind=None, count=1):
+        with self.lock:
+            Profiler.add(self.phases, phase, seconds, count)
+            if kind is not None:
+                Profiler.add(self.kinds.setdefault(kind, {}), phase, seconds, count)
+        if self.callback is not None:
+            self.callback(phase, kind, seconds, count)
+
+    def count(self, counter, amount=1):
+        with self.lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @staticmethod
+    def add(stats, phase, seconds, count):
+        totals = stats.setdefault(phase, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += count
+
+    def timed(self, phase, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(phase, time.perf_counter() - start)
+            yield item
+
+    def state(self):
+        return self.phases, self.kinds, self.counters
+
+    def merge(self, state):
+        phases, kinds, counters = state
+        for kind, stats in kinds.items():
+            for phase, (seconds, count) in stats.items():
+                self.record(phase, seconds, kind, count)
+        for counter, amount in counters.items():
+            self.count(counter, amount)
+
+    def start(self):
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        self.snapshot('start')
+
+    def stop(self):
+        self.snapshot('end')
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def snapshot(self, label):
+        if not self.trace_memory or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+        self.memory.append({
+            'label': label,
+            'current': current,
+            'peak': peak,
+            'top': [{'location': str(stat.traceback), 'size': stat.size, 'count': stat.count} for stat in top]
+        })
+        if self.memory_callback is not None:
+            self.memory_callback(label, current, peak)
+
+    def report(self):
+        return {
+            'phases': {phase: {'seconds': seconds, 'count': count}
+                       for phase, (seconds, count) in self.phases.items()},
+            'kinds': {kind: {phase: {'seconds': seconds, 'count': count}
+                             for phase, (seconds, count) in stats.items()}
+                      for kind, stats in self.kinds.items()},
+            'counters': dict(self.counters),
+            'memory': self.memory
+        }
+
+    @staticmethod
+    def format(report):
+        lines = ['{:<20} {:>10} {:>10}'.format('phase', 'seconds', 'count')]
+        for phase, stats in sorted(report['phases'].items(), key=lambda item: -item[1]['seconds']):
+            lines.append('{:<20} {seconds:>10.4f} {count:>10}'.format(phase, **stats))
+        for kind, phases in sorted(report['kinds'].items()):
+            lines.append('')
+            lines.append('{:<20} {:>10} {:>10}'.format(kind, 'seconds', 'count'))
+            for phase, stats in sorted(phases.items()):
+                lines.append('  {:<18} {seconds:>10.4f} {count:>10}'.format(phase, **stats))
+        if report['counters']:
+            lines.append('')
+            for counter, amount in sorted(report['counters'].items()):
+                lines.append('{:<20} {:>21}'.format(counter, amount))
+        if report['memory']:
+            lines.append('')
+            for snapshot in report['memory']:
+                lines.append('memory at {label:<10} current {current:>12} peak {peak:>12}'.format(**snapshot))
+        return '\n'.join(lines)
+
+
+class EntryStream:
+    chunk_size = 1 << 16
+    whitespace = ' \t\n\r'
+
+    def __init__(self, path):
+        self.path = path
+        self.decoder = json.JSONDecoder()
+        self.json_file = None
+        self.key_iter = None
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def read_header(self):
+        header = {}
+        self.open()
+        try:
+            for key in self.keys():
+                if key == 'entries':
+                    self.skip_entries()
+                else:
+                    header[key] = self.value()
+        finally:
+            self.close()
+        return header
+
+    def start(self):
+        header = {}
+        self.open()
+        self.key_iter = self.keys()
+        for key in self.key_iter:
+            if key == 'entries':
+                return header
+            header[key] = self.value()
+        self.close()
+        return None
+
+    def entries(self):
+        try:
+            for entry in self.array():
+                yield entry
+            for key in self.key_iter:
+                self.value()
+        finally:
+            self.close()
+
+    def open(self):
+        self.json_file = open(self.path, 'r')
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def close(self):
+        if self.json_file is not None:
+            self.json_file.close()
+            self.json_file = None
+
+    def fill(self):
+        chunk = self.json_file.read(EntryStream.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in EntryStream.whitespace:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of {path}'.format(path=self.path))
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError('Expected {char!r} at offset {pos} of {path}'.format(
+                char=char, pos=self.pos, path=self.path))
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def keys(self):
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect('}')
+            return
+
+    def array(self):
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ',':
+                self.pos += 1
+                continue
+            self.expect(']')
+            return
+
+    def skip_entries(self):
+        for entry in self.array():
+            pass
+
+
+class Template:
+    slots = ('modid', 'name', 'origin_block')
+    probe = {'modid': 'probe"mod{0}', 'name': 'probe\\name}<modid>', 'origin_block': 'probe{origin}\u00e9'}
+    cache = {}
+
+    def __init__(self, outputs, lang_key, encoder):
+        self.encoder = encoder
+        self.outputs = [(Template.compile(path), Template.compile(text)) for path, text in outputs]
+        self.lang_key = Template.compile(lang_key)
+
+    @staticmethod
+    def compile(text):
+        text = text.replace('{', '{{').replace('}', '}}')
+        for slot in Template.slots:
+            text = text.replace('<' + slot + '>', '{' + slot + '}')
+        return text
+
+    @staticmethod
+    def get(parent, has_origin, encoder):
+        key = (parent, has_origin, encoder.key)
+        if key not in Template.cache:
+            Template.cache[key] = Template.build(parent, has_origin, encoder)
+        return Template.cache[key]
+
+    @staticmethod
+    def build(parent, has_origin, encoder):
+        entry = {'parent': parent, 'name': '<name>', 'lang': {'<lang>': '<text>'}}
+        if has_origin:
+            entry['origin_block'] = '<origin_block>'
+        try:
+            outputs, langs = SerialHelper.render_slow('<modid>', entry, encoder)
+        except Exception:
+            return None
+        lang_dict = langs.get('<lang>')
+        if list(langs) != ['<lang>'] or len(lang_dict) != 1 or list(lang_dict.values()) != ['<text>']:
+            return None
+        template = Template(outputs, next(iter(lang_dict)), encoder)
+
+        probe = dict(entry, name=Template.probe['name'])
+        if has_origin:
+            probe['origin_block'] = Template.probe['origin_block']
+        if template.render(Template.probe['modid'], probe) != \
+                SerialHelper.render_slow(Template.probe['modid'], probe, encoder):
+            return None
+        return template
+
+    def render(self, modid, entry):
+        slots = {'modid': modid, 'name': entry.get('name'), 'origin_block': entry.get('origin_block')}
+        escaped = {}
+        for slot, value in slots.items():
+            if value is not None:
+                escaped[slot] = self.encoder.escape(value)
+        outputs = [(path.format(**slots), text.format(**escaped)) for path, text in self.outputs]
+        langs = {}
+        lang_key = self.lang_key.format(**slots)
+        for lang, text in entry.get('lang').items():
+            langs[lang] = {lang_key: text}
+        return outputs, langs
+
+
+class Layout:
+    name = 'flat'
+
+    def __init__(self, modid=None, pack_format=6):
+        self.modid = modid
+        self.pack_format = pack_format
+
+    def map(self, path):
+        return path
+
+    def rewrite(self, text):
+        return text
+
+    def extra_files(self):
+        return []
+
+
+class PackLayout(Layout):
+    assets = ('models', 'blockstates', 'lang')
+    data = {'loot_tables': 'loot_tables/blocks', 'loot_table': 'loot_table/blocks'}
+    include_assets = True
+    include_data = True
+    pack_mcmeta = False
+
+    def map(self, path):
+        folder, rest = path.split('/', 1)
+        if folder in PackLayout.assets:
+            if self.include_assets:
+                return 'assets/{modid}/{path}'.format(modid=self.modid, path=path)
+        elif folder in PackLayout.data:
+            if self.include_data:
+                return 'data/{modid}/{folder}/{rest}'.format(
+                    modid=self.modid, folder=PackLayout.data[folder], rest=rest)
+        return None
+
+    def extra_files(self):
+        if not self.pack_mcmeta:
+            return []
+        json_data = {
+            'pack': {
+                'pack_format': self.pack_format,
+                'description': self.modid
+            }
+        }
+        return [('pack.mcmeta', json_data)]
+
+
+class ModLayout(PackLayout):
+    name = 'mod'
+
+
+class ResourcePackLayout(PackLayout):
+    name = 'resourcepack'
+    include_data = False
+    pack_mcmeta = True
+
+
+class DataPackLayout(PackLayout):
+    name = 'datapack'
+    include_assets = False
+    pack_mcmeta = True
+
+
+layouts = {layout.name: layout for layout in (Layout, ModLayout, ResourcePackLayout, DataPackLayout)}
+
+
+class GameVersion:
+    name = 'default'
+    folders = {}
+    textures = {}
+    pack_formats = {'resourcepack': 6, 'datapack': 6}
+
+    def __init__(self, layout, modid=None, encoder=None):
+        self.layout = layout
+        prefix = '"' + (encoder or JsonEncoder()).escape(modid or '') + ':'
+        self.replacements = [(prefix + old, prefix + new) for old, new in self.textures.items()]
+
+    def map(self, path):
+        folder, slash, rest = path.partition('/')
+        if folder in self.folders:
+            path = self.folders[folder] + slash + rest
+        return self.layout.map(path)
+
+    def rewrite(self, text):
+        for old, new in self.replacements:
+            if old in text:
+                text = text.replace(old, new)
+        return text
+
+    def extra_files(self):
+        return self.layout.extra_files()
+
+
+class FlatteningVersion(GameVersion):
+    name = '1.13'
+    textures = {'blocks/': 'block/', 'items/': 'item/'}
+    pack_formats = {'resourcepack': 4, 'datapack': 4}
+
+
+class SingularFoldersVersion(FlatteningVersion):
+    name = '1.21'
+    folders = {'loot_tables': 'loot_table'}
+    pack_formats = {'resourcepack': 34, 'datapack': 48}
+
+
+versions = {version.name: version for version in (GameVersion, FlatteningVersion, SingularFoldersVersion)}
+
+
+def get_layout(options, modid, encoder=None):
+    pack_format = options.pack_format
+    if pack_format is None:
+        pack_format = versions[options.version].pack_formats.get(options.layout)
+    layout = layouts[options.layout](modid, pack_format)
+    if options.version != GameVersion.name:
+        layout = versions[options.version](layout, modid, encoder)
+    return layout
+
+
+class DirectoryOutput:
+    concurrent = True
+
+    def __init__(self, root='.'):
+        self.root = root
+        self.dirs = set()
+
+    def prepare(self, paths):
+        for dir in set(os.path.dirname(path) for path in paths):
+            self.make_dir(os.path.join(self.root, dir))
+
+    def make_dir(self, dir):
+        if dir not in self.dirs:
+            os.makedirs(dir, exist_ok=True)
+            self.dirs.add(dir)
+
+    def write(self, path, text):
+        path = os.path.join(self.root, path)
+        self.make_dir(os.path.dirname(path))
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json_file.write(text)
+
+    def close(self):
+        pass
+
+
+class StagedOutput(DirectoryOutput):
+    stage_name = '.mc_json_helper_stage'
+    backup_name = '.mc_json_helper_backup'
+    commit_name = '.mc_json_helper_commit'
+
+    def __init__(self, root='.', tops=()):
+        self.final_root = root
+        self.tops = list(tops)
+        self.stage = os.path.join(root, StagedOutput.stage_name)
+        self.backup = os.path.join(root, StagedOutput.backup_name)
+        self.committed = False
+        self.written = set()
+        StagedOutput.recover(root)
+        os.makedirs(self.stage)
+        super().__init__(self.stage)
+
+    @staticmethod
+    def recover(root):
+        stage = os.path.join(root, StagedOutput.stage_name)
+        backup = os.path.join(root, StagedOutput.backup_name)
+        marker = os.path.join(stage, StagedOutput.commit_name)
+        if os.path.isfile(marker):
+            with open(marker, 'r') as json_file:
+                data = json.load(json_file)
+            StagedOutput.swap(root, data['tops'], data['staged'])
+        elif os.path.isdir(backup):
+            for top in os.listdir(backup):
+                if not os.path.exists(os.path.join(root, top)):
+                    os.rename(os.path.join(backup, top), os.path.join(root, top))
+        shutil.rmtree(backup, ignore_errors=True)
+        shutil.rmtree(stage, ignore_errors=True)
+
+    @staticmethod
+    def swap(root, tops, staged):
+        stage = os.path.join(root, StagedOutput.stage_name)
+        backup = os.path.join(root, StagedOutput.backup_name)
+        os.makedirs(backup, exist_ok=True)
+        for top in tops:
+            source = os.path.join(stage, top)
+            target = os.path.join(root, top)
+            if top in staged and not os.path.exists(source):
+                continue
+            if os.path.exists(target) and not os.path.exists(os.path.join(backup, top)):
+                os.rename(target, os.path.join(backup, top))
+            if top in staged:
+                os.rename(source, target)
+        StagedOutput.sync_dir(root)
+
+    def link_tree(self, top):
+        source = os.path.join(self.final_root, top)
+        if os.path.isfile(source):
+            if top not in self.written:
+                StagedOutput.link(source, os.path.join(self.stage, top))
+            return
+        for dir, dirs, names in os.walk(source):
+            relative = os.path.relpath(dir, self.final_root).replace(os.sep, '/') + '/'
+            staged = os.path.join(self.stage, relative)
+            for name in names:
+                if relative + name not in self.written:
+                    self.make_dir(staged)
+                    StagedOutput.link(os.path.join(dir, name), os.path.join(staged, name))
+
+    @staticmethod
+    def link(source, target):
+        try:
+            os.link(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def write(self, path, text):
+        self.written.add(path)
+        super().write(path, text)
+
+    def commit(self):
+        for top in self.tops:
+            self.link_tree(top)
+        if hasattr(os, 'sync'):
+            os.sync()
+        staged = [top for top in self.tops if os.path.exists(os.path.join(self.stage, top))]
+        self.write_marker(staged)
+        StagedOutput.swap(self.final_root, self.tops, staged)
+        self.committed = True
+        shutil.rmtree(self.backup)
+        shutil.rmtree(self.stage)
+
+    def write_marker(self, staged):
+        marker = os.path.join(self.stage, StagedOutput.commit_name)
+        with open(marker + '.tmp', 'w') as json_file:
+            json_file.write(json.dumps({'tops': self.tops, 'staged': staged}))
+            json_file.flush()
+            os.fsync(json_file.fileno())
+        os.replace(marker + '.tmp', marker)
+        StagedOutput.sync_dir(self.stage)
+
+    @staticmethod
+    def sync_dir(path):
+        if os.name != 'posix':
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self.committed:
+            return
+        if os.path.isfile(os.path.join(self.stage, StagedOutput.commit_name)):
+            try:
+                StagedOutput.recover(self.final_root)
+            except OSError:
+                pass
+        else:
+            shutil.rmtree(self.stage, ignore_errors=True)
+
+
+class ZipOutput:
+    concurrent = False
+    compressions = {
+        'stored': zipfile.ZIP_STORED,
+        'deflated': zipfile.ZIP_DEFLATED,
+        'bzip2': zipfile.ZIP_BZIP2,
+        'lzma': zipfile.ZIP_LZMA
+    }
+    date_time = (1980, 1, 1, 0, 0, 0)
+
+    def __init__(self, path, compression='deflated', compress_level=None):
+        if compression not in ZipOutput.compressions:
+            raise ValueError('Unknown compression {name}, expected one of {names}'.format(
+                name=compression, names=', '.join(sorted(ZipOutput.compressions))))
+        dir = os.path.dirname(path)
+        if dir and not os.path.isdir(dir):
+            os.makedirs(dir)
+        self.path = path
+        self.compression = ZipOutput.compressions[compression]
+        self.compress_level = compress_level
+        self.archive = zipfile.ZipFile(path, 'w', self.compression)
+
+    def prepare(self, paths):
+        pass
+
+    def write(self, path, text):
+        info = zipfile.ZipInfo(path, ZipOutput.date_time)
+        info.compress_type = self.compression
+        info.external_attr = 0o644 << 16
+        self.archive.writestr(info, text.encode('utf-8'), compresslevel=self.compress_level)
+
+    def close(self):
+        self.archive.close()
+
+
+class AsyncWriter:
+    def __init__(self, output, limit=32):
+        self.output = output
+        self.dirs = {}
+        self.pool = ThreadPoolExecutor(max_workers=limit)
+        self.loop = asyncio.new_event_loop()
+        self.loop.set_default_executor(self.pool)
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def submit(self, fn, batch):
+        return asyncio.run_coroutine_threadsafe(self.write_batch(fn, batch), self.loop)
+
+    async def write_batch(self, fn, batch):
+        waiting = []
+        for path, text in batch:
+            dir = os.path.dirname(os.path.join(self.output.root, path))
+            ready = self.dirs.get(dir)
+            if ready is None:
+                ready = self.dirs[dir] = self.loop.run_in_executor(None, self.output.make_dir, dir)
+            if not ready.done() and ready not in waiting:
+                waiting.append(ready)
+        for ready in waiting:
+            await ready
+        await self.loop.run_in_executor(None, fn, batch)
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.pool.shutdown()
+
+
+class LangBuilder:
+    spill_keys = 200000
+    keys_name = '.mc_json_helper_lang_keys.json'
+
+    def __init__(self, encoder, layout, root=None, merge=True, jobs=1, spill_keys=None, shared=None):
+        self.encoder = encoder
+        self.layout = layout
+        self.root = root
+        self.merge = merge
+        self.jobs = jobs
+        self.spill_keys = spill_keys or LangBuilder.spill_keys
+        self.shared = shared
+        self.buffers = {}
+        self.buffered = 0
+        self.runs = {}
+        self.removed = {}
+        self.temp_dir = None
+        self.generated = {}
+        self.previous = {}
+        if merge and root is not None:
+            self.previous = LangBuilder.load_keys(root)
+
+    @staticmethod
+    def load_keys(root):
+        path = os.path.join(root, LangBuilder.keys_name)
+        if not os.path.isfile(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as json_file:
+                data = json.load(json_file)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    @staticmethod
+    def save_keys(root, generated):
+        path = os.path.join(root, LangBuilder.keys_name)
+        temp_path = '{path}.{pid}.tmp'.format(path=path, pid=os.getpid())
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as json_file:
+                json_file.write(json.dumps(generated, sort_keys=True))
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def save(self):
+        if self.root is not None:
+            LangBuilder.save_keys(self.root, dict((lang, keys) for lang, keys in self.generated.items() if keys))
+
+    def add(self, lang, lang_dict):
+        buffer = self.buffers.setdefault(lang, {})
+        before = len(buffer)
+        buffer.update(lang_dict)
+        self.buffered += len(buffer) - before
+        if self.buffered >= self.spill_keys:
+            self.spill()
+
+    def remove(self, lang, keys):
+        self.removed.setdefault(lang, set()).update(keys)
+
+    def langs(self):
+        return sorted(set(self.buffers) | set(self.runs))
+
+    def spill(self):
+        if self.temp_dir is None:
+            self.temp_dir = tempfile.mkdtemp(prefix='mc_json_helper_lang_')
+        for lang, buffer in self.buffers.items():
+            runs = self.runs.setdefault(lang, [])
+            path = os.path.join(self.temp_dir, '{lang}.{run}.jsonl'.format(lang=lang, run=len(runs)))
+            with open(path, 'w', encoding='utf-8') as run_file:
+                for key in sorted(buffer):
+                    run_file.write(json.dumps([key, buffer[key]]) + '\n')
+            runs.append(path)
+        self.buffers = {}
+        self.buffered = 0
+
+    def existing_path(self, lang):
+        if not self.merge or self.root is None:
+            return None
+        path = self.layout.map('lang/' + lang + '.json')
+        if path is None:
+            return None
+        return os.path.join(self.root, path)
+
+    def tasks(self):
+        langs = self.langs()
+        for lang in sorted(set(langs) | set(self.previous)):
+            existing_path = self.existing_path(lang)
+            if lang not in langs and (existing_path is None or not os.path.isfile(existing_path)):
+                continue
+            buffer = self.buffers.pop(lang, {})
+            items = [(key, buffer[key]) for key in sorted(buffer)]
+            removed = self.removed.get(lang, set()) | set(self.previous.get(lang, ()))
+            yield lang, existing_path, self.runs.get(lang, []), items, removed, self.encoder
+
+    def build_all(self):
+        try:
+            parallel = self.jobs > 1 and len(self.langs()) > 1
+            tasks = self.tasks()
+            if self.shared is not None:
+                tasks, built = self.shared_tasks(tasks)
+                for lang, text, keys in built:
+                    self.generated[lang] = keys
+                    yield lang, text
+            if parallel and tasks:
+                with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+                    for lang, text, keys in pool.map(LangBuilder.build_task, tasks):
+                        self.generated[lang] = keys
+                        yield lang, text
+            else:
+                for task in tasks:
+                    lang, text, keys = LangBuilder.build_task(task)
+                    self.generated[lang] = keys
+                    yield lang, text
+        finally:
+            self.close()
+
+    def shared_tasks(self, tasks):
+        pending = []
+        built = []
+        for task in tasks:
+            lang, existing_path, runs, items, removed, encoder = task
+            if runs or existing_path is not None and os.path.isfile(existing_path):
+                pending.append(task)
+                continue
+            if lang not in self.shared:
+                self.shared[lang] = LangBuilder.build_task(task)[1:]
+            built.append((lang,) + self.shared[lang])
+        return pending, built
+
+    def close(self):
+        if self.temp_dir is not None:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+            self.temp_dir = None
+        self.runs = {}
+
+    @staticmethod
+    def build_task(task):
+        lang, existing_path, runs, items, removed, encoder = task
+        existing = {}
+        if existing_path is not None and os.path.isfile(existing_path):
+            with open(existing_path, 'r', encoding='utf-8') as json_file:
+                existing = json.load(json_file)
+            for key in removed:
+                existing.pop(key, None)
+        if not runs:
+            existing.update(items)
+            return lang, encoder.dumps(existing, sort_keys=True), [key for key, value in items]
+
+        sources = [[(key, existing[key]) for key in sorted(existing)]]
+        sources.extend(LangBuilder.read_run(run) for run in runs)
+        sources.append(items)
+        tagged = [LangBuilder.tag(source, index) for index, source in enumerate(sources)]
+        keys = []
+        return lang, LangBuilder.encode(LangBuilder.latest(heapq.merge(*tagged), keys), encoder), keys
+
+    @staticmethod
+    def read_run(path):
+        with open(path, 'r', encoding='utf-8') as run_file:
+            for line in run_file:
+                key, value = json.loads(line)
+                yield key, value
+
+    @staticmethod
+    def tag(source, index):
+        for key, value in source:
+            yield key, index, value
+
+    @staticmethod
+    def latest(merged, keys=None):
+        previous = None
+        for key, index, value in merged:
+            if previous is not None and previous[0] != key:
+                yield previous
+            if index and keys is not None and (not keys or keys[-1] != key):
+                keys.append(key)
+            previous = (key, value)
+        if previous is not None:
+            yield previous
+
+    @staticmethod
+    def encode(items, encoder):
+        if encoder.minify:
+            start, separator, colon, end = '{', ',', ':', '}'
+        else:
+            start, separator, colon, end = '{\n  ', ',\n  ', ': ', '\n}'
+        parts = []
+        for key, value in items:
+            parts.append(encoder.dumps(key) + colon + encoder.dumps(value))
+        if not parts:
+            return '{}'
+        return start + separator.join(parts) + end
 
 
 class SerialHelper:
+    __slots__ = ()
     path = 'input.json'
+    output = DirectoryOutput()
+    layout = Layout()
     langs_dictionairy = {}
+    lang_builder = None
+    manifest = None
+    result = None
+    encoder = JsonEncoder()
+    profiler = None
+    profile_kind = None
+    capture = None
+    writer = None
+    pending_writes = deque()
+    max_pending_writes = 64
+    batch = []
+    batch_size = 128
+    uses_origin = False
+
+    @staticmethod
+    def reset(output=None, layout=None, manifest=None, result=None, encoder=None, profiler=None):
+        SerialHelper.output = output or DirectoryOutput()
+        SerialHelper.layout = layout or Layout()
+        SerialHelper.encoder = encoder or JsonEncoder()
+        SerialHelper.langs_dictionairy = {}
+        SerialHelper.lang_builder = None
+        SerialHelper.manifest = manifest
+        SerialHelper.result = result
+        SerialHelper.profiler = profiler
+        SerialHelper.capture = None
+        SerialHelper.writer = None
+        SerialHelper.pending_writes = deque()
+        SerialHelper.batch = []
 
     @staticmethod
-    def read():
-        if os.path.isfile(SerialHelper.path):
-            with open(SerialHelper.path, 'r') as json_file:
+    def read(path=None):
+        path = path or SerialHelper.path
+        if os.path.isdir(path):
+            header, entries = ShardedInput(path).read()
+            return dict(header, entries=list(entries))
+        if path.endswith('.jsonl') and os.path.isfile(path):
+            header, entries = ShardedInput.parse_shard(path)
+            return dict(header, entries=entries)
+        if os.path.isfile(path):
+            with open(path, 'r') as json_file:
                 return json.load(json_file)
         else:
-            raise FileNotFoundError('Missing input.json')
+            raise FileNotFoundError('Missing {path}'.format(path=path))
+
+    @staticmethod
+    def stream(path=None):
+        path = path or SerialHelper.path
+        if os.path.isdir(path):
+            return ShardedInput(path).read()
+        if path.endswith('.jsonl') and os.path.isfile(path):
+            header, entries = ShardedInput.parse_shard(path)
+            return header, iter(entries)
+        if not os.path.isfile(path):
+            raise FileNotFoundError('Missing {path}'.format(path=path))
+        entry_stream = EntryStream(path)
+        header = entry_stream.start()
+        if header is None:
+            return entry_stream.read_header(), iter(())
+        if 'modid' not in header:
+            header = dict(header, **EntryStream(path).read_header())
+        return header, entry_stream.entries()
 
     @staticmethod
     def write(dir, name, json_data):
-        if not os.path.isdir(dir):
-            os.makedirs(dir)
         path = '{dir}/{name}'.format(dir=dir, name=name) + '.json'
-        with open(path, 'w') as json_file:
-            json.dump(json_data, json_file, sort_keys=False, indent=2)
+        if SerialHelper.profiler is not None:
+            start = time.perf_counter()
+            text = SerialHelper.encoder.dumps(json_data)
+            SerialHelper.profiler.record('encode', time.perf_counter() - start, SerialHelper.profile_kind)
+        else:
+            text = SerialHelper.encoder.dumps(json_data)
+        if SerialHelper.capture is not None:
+            SerialHelper.capture.append((path, text))
+        else:
+            SerialHelper.write_text(path, text)
 
     @staticmethod
-    def write_lang_file():
-        if not os.path.isdir('lang'):
-            os.mkdir('lang')
+    def write_text(path, text):
+        path = SerialHelper.layout.map(path)
+        if path is None:
+            return
+        text = SerialHelper.layout.rewrite(text)
+        if SerialHelper.manifest is not None:
+            if not SerialHelper.manifest.record_output(path, text):
+                if SerialHelper.result is not None:
+                    SerialHelper.result.files_unchanged += 1
+                return
+        if SerialHelper.result is not None:
+            SerialHelper.result.files_written += 1
+        if SerialHelper.writer is not None:
+            SerialHelper.batch.append((path, text))
+            if len(SerialHelper.batch) >= SerialHelper.batch_size:
+                SerialHelper.submit_batch()
+        else:
+            SerialHelper.write_output(path, text)
+
+    @staticmethod
+    def submit_batch():
+        if len(SerialHelper.pending_writes) >= SerialHelper.max_pending_writes:
+            SerialHelper.pending_writes.popleft().result()
+        SerialHelper.pending_writes.append(
+            SerialHelper.writer.submit(SerialHelper.write_batch, SerialHelper.batch))
+        SerialHelper.batch = []
+
+    @staticmethod
+    def write_batch(batch):
+        for path, text in batch:
+            SerialHelper.write_output(path, text)
+
+    @staticmethod
+    def write_output(path, text):
+        profiler = SerialHelper.profiler
+        if profiler is None:
+            SerialHelper.output.write(path, text)
+            return
+        start = time.perf_counter()
+        SerialHelper.output.write(path, text)
+        profiler.record('write', time.perf_counter() - start)
+        profiler.count('bytes', len(text))
+
+    @staticmethod
+    def flush_writes():
+        if SerialHelper.batch:
+            SerialHelper.submit_batch()
+        pending_writes = SerialHelper.pending_writes
+        while pending_writes:
+            pending_writes.popleft().result()
 
+    @staticmethod
+    def write_lang_file():
+        if SerialHelper.lang_builder is not None:
+            start = time.perf_counter()
+            for lang, text in SerialHelper.lang_builder.build_all():
+                if SerialHelper.profiler is not None:
+                    SerialHelper.profiler.record('encode', time.perf_counter() - start, 'lang')
+                SerialHelper.write_text('lang/' + lang + '.json', text)
+                start = time.perf_counter()
+            return
         for key in SerialHelper.langs_dictionairy.keys():
             path = 'lang/' + key + '.json'
-            with open(path, 'w') as json_file:
-                json.dump(SerialHelper.langs_dictionairy.get(
-                    key), json_file, sort_keys=True, indent=2)
+            start = time.perf_counter()
+            text = SerialHelper.encoder.dumps(SerialHelper.langs_dictionairy.get(key), sort_keys=True)
+            if SerialHelper.profiler is not None:
+                SerialHelper.profiler.record('encode', time.perf_counter() - start, 'lang')
+            SerialHelper.write_text(path, text)
+
+    @staticmethod
+    def write_extra_files():
+        for path, json_data in SerialHelper.layout.extra_files():
+            if SerialHelper.result is not None:
+                SerialHelper.result.files_written += 1
+            SerialHelper.output.write(path, SerialHelper.encoder.dumps(json_data))
 
     @staticmethod
     def add_to_langs_dict(lang, lang_dict):
-        if SerialHelper.langs_dictionairy.get(lang):
+        if SerialHelper.manifest is not None:
+            SerialHelper.manifest.record_lang(lang, lang_dict)
+        if SerialHelper.lang_builder is not None and SerialHelper.capture is None:
+            SerialHelper.lang_builder.add(lang, lang_dict)
+        elif SerialHelper.langs_dictionairy.get(lang):
             SerialHelper.langs_dictionairy.get(lang).update(lang_dict)
         else:
             SerialHelper.langs_dictionairy.update({lang: lang_dict})
 
+    @staticmethod
+    def render(modid, entry, encoder=None):
+        encoder = encoder or SerialHelper.encoder
+        name = entry.get('name')
+        origin_block = entry.get('origin_block')
+        if isinstance(modid, str) and isinstance(name, str) and isinstance(entry.get('lang'), dict) \
+                and (not origin_block or isinstance(origin_block, str)):
+            template = Template.get(entry.get('parent'), bool(origin_block), encoder)
+            if template is not None:
+                return template.render(modid, entry)
+        return SerialHelper.render_slow(modid, entry, encoder)
+
+    @staticmethod
+    def render_timed(modid, entry, encoder=None):
+        profiler = SerialHelper.profiler
+        kind = SerialHelper.kind(entry)
+        SerialHelper.profile_kind = kind
+        start = time.perf_counter()
+        try:
+            result = SerialHelper.render(modid, entry, encoder)
+        finally:
+            SerialHelper.profile_kind = None
+        profiler.record('render', time.perf_counter() - start, kind)
+        profiler.count('outputs', len(result[0]))
+        return result
+
+    @staticmethod
+    def kind(entry):
+        generator = types.get(entry.get('parent'))
+        return generator.__name__ if generator is not None else 'unknown'
+
+    @staticmethod
+    def render_slow(modid, entry, encoder=None):
+        outputs = []
+        langs = {}
+        saved = SerialHelper.capture, SerialHelper.langs_dictionairy, SerialHelper.manifest, SerialHelper.encoder
+        SerialHelper.capture = outputs
+        SerialHelper.langs_dictionairy = langs
+        SerialHelper.manifest = None
+        SerialHelper.encoder = encoder or SerialHelper.encoder
+        try:
+            SerialHelper.generate_entry(modid, entry)
+        finally:
+            SerialHelper.capture, SerialHelper.langs_dictionairy, SerialHelper.manifest, SerialHelper.encoder = saved
+        return outputs, langs
+
+    @staticmethod
+    def render_all(modid, entries, encoder=None, profile=False):
+        if not profile:
+            return [SerialHelper.render(modid, entry, encoder) for entry in entries]
+        SerialHelper.profiler = Profiler()
+        try:
+            results = [SerialHelper.render_timed(modid, entry, encoder) for entry in entries]
+            return results, SerialHelper.profiler.state()
+        finally:
+            SerialHelper.profiler = None
+
+    @staticmethod
+    def generate_entry(modid, entry):
+        parent = entry.get('parent')
+        name = entry.get('name')
+        langs_dict = entry.get('lang')
+        if entry.get('origin_block'):
+            types.get(parent)(modid, name, langs_dict, entry.get('origin_block'))
+        else:
+            types.get(parent)(modid, name, langs_dict)
+
+
+class BlockState:
+    def __init__(self, properties=(), variant=None, parts=()):
+        self.properties = list(properties)
+        self.variant = variant
+        self.parts = list(parts)
+
+    @staticmethod
+    def rotate(model, x=0, y=0, uvlock=False):
+        json_data = {'model': model}
+        if x % 360:
+            json_data['x'] = x % 360
+        if y % 360:
+            json_data['y'] = y % 360
+        if uvlock:
+            json_data['uvlock'] = True
+        return json_data
+
+    @staticmethod
+    def size(json_data):
+        return len(json.dumps(json_data, separators=(',', ':')))
+
+    def states(self):
+        names = [name for name, values in self.properties]
+        for values in product(*[values for name, values in self.properties]):
+            yield dict(zip(names, values))
+
+    def applies(self, state):
+        if self.variant is not None:
+            apply = self.variant(state)
+            return [apply] if apply is not None else []
+        return [apply for when, apply in self.parts
+                if all(state.get(name) == value for name, value in (when or {}).items())]
+
+    def variants(self, limit=None):
+        variants = {}
+        size = BlockState.size({'variants': {}}) - 1
+        for state in self.states():
+            applies = self.applies(state)
+            if len(applies) > 1:
+                return None
+            if not applies:
+                if self.variant is None:
+                    return None
+                continue
+            key = ','.join(name + '=' + value for name, value in state.items())
+            variants[key] = applies[0]
+            size += BlockState.size(key) + BlockState.size(applies[0]) + 2
+            if limit is not None and size > limit:
+                return None
+        return {'variants': variants}
+
+    def multipart(self, limit=None):
+        parts = self.parts
+        if self.variant is not None:
+            parts = ((state, apply) for state in self.states() for apply in self.applies(state))
+        multipart = []
+        size = BlockState.size({'multipart': []}) - 1
+        for when, apply in parts:
+            part = {'when': when, 'apply': apply} if when else {'apply': apply}
+            multipart.append(part)
+            size += BlockState.size(part) + 1
+            if limit is not None and size > limit:
+                return None
+        return {'multipart': multipart}
+
+    def json_data(self):
+        if self.variant is not None:
+            variants = self.variants()
+            return self.multipart(BlockState.size(variants)) or variants
+        multipart = self.multipart()
+        return self.variants(BlockState.size(multipart)) or multipart
+
 
 class Item(SerialHelper):
+    __slots__ = ('modid', 'name', 'langs_dict')
+
     def __init__(self, modid, name, langs_dict):
         self.modid = modid
         self.name = name
@@ -62,12 +1708,14 @@ class Item(SerialHelper):
 
     def add_lang(self):
         identifier = 'item.' + self.modid + '.' + self.name
-        for lang in langs_dict:
-            lang_dict = {identifier: langs_dict[lang]}
+        for lang in self.langs_dict:
+            lang_dict = {identifier: self.langs_dict[lang]}
             self.add_to_langs_dict(lang, lang_dict)
 
 
 class Block(SerialHelper):
+    __slots__ = ('modid', 'name', 'langs_dict')
+
     def __init__(self, modid, name, langs_dict):
         self.modid = modid
         self.name = name
@@ -91,11 +1739,7 @@ class Block(SerialHelper):
 
     def write_blockstate(self):
         identifier = self.modid + ':block/' + self.name
-        json_data = {
-            'variants': {
-                '': {'model': identifier}
-            }
-        }
+        json_data = BlockState(variant=lambda state: BlockState.rotate(identifier)).json_data()
         SerialHelper.write('blockstates', self.name, json_data)
 
     def write_blockitem(self):
@@ -130,12 +1774,14 @@ class Block(SerialHelper):
 
     def add_lang(self):
         identifier = 'block.' + self.modid + '.' + self.name
-        for lang in langs_dict:
-            lang_dict = {identifier: langs_dict[lang]}
+        for lang in self.langs_dict:
+            lang_dict = {identifier: self.langs_dict[lang]}
             self.add_to_langs_dict(lang, lang_dict)
 
 
 class OrientableBlock(Block):
+    __slots__ = ()
+
     def write_block_model(self):
         identifier = self.modid + ':blocks/' + self.name
         json_data = {
@@ -150,29 +1796,21 @@ class OrientableBlock(Block):
 
     def write_blockstate(self):
         identifier = self.modid + ':block/' + self.name
-        json_data = {
-            'variants': {
-                'facing=north': {'model': identifier},
-                'facing=east': {'model': identifier, 'y': 90},
-                'facing=south': {'model': identifier, 'y': 180},
-                'facing=west': {'model': identifier, 'y': 270}
-            }
-        }
+        rotations = {'north': 0, 'east': 90, 'south': 180, 'west': 270}
+        json_data = BlockState(
+            [('facing', ['north', 'east', 'south', 'west'])],
+            lambda state: BlockState.rotate(identifier, y=rotations[state['facing']])
+        ).json_data()
         self.write('blockstates', self.name, json_data)
 
 
 class StairsBlock(Block):
-    def __init__(self, modid, name, lang_dict, origin_block):
-        self.modid = modid
-        self.name = name
-        self.lang_dict = lang_dict
-        self.origin_block = origin_block
+    __slots__ = ('origin_block',)
+    uses_origin = True
 
-        self.write_block_model()
-        self.write_blockstate()
-        self.write_blockitem()
-        self.write_loot_table()
-        self.add_lang()
+    def __init__(self, modid, name, langs_dict, origin_block):
+        self.origin_block = origin_block
+        super().__init__(modid, name, langs_dict)
 
     def write_block_model(self):
         identifier = self.modid + ':blocks/' + self.origin_block
@@ -207,233 +1845,38 @@ class StairsBlock(Block):
         self.write('models/block', self.name + '_outer', json_data)
 
     def write_blockstate(self):
-        identifier = modid + ':block/' + self.name
-        identifier_inner = identifier + '_inner'
-        identifier_outer = identifier + '_outer'
-        json_data = {
-            'variants': {
-                'facing=east,half=bottom,shape=inner_left': {
-                    'model': identifier_inner,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=east,half=bottom,shape=inner_right': {
-                    'model': identifier_inner
-                },
-                'facing=east,half=bottom,shape=outer_left': {
-                    'model': identifier_outer,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=east,half=bottom,shape=outer_right': {
-                    'model': identifier_outer
-                },
-                'facing=east,half=bottom,shape=straight': {
-                    'model': identifier
-                },
-                'facing=east,half=top,shape=inner_left': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'uvlock': True
-                },
-                'facing=east,half=top,shape=inner_right': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=east,half=top,shape=outer_left': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'uvlock': True
-                },
-                'facing=east,half=top,shape=outer_right': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=east,half=top,shape=straight': {
-                    'model': identifier,
-                    'x': 180,
-                    'uvlock': True
-                },
-                'facing=north,half=bottom,shape=inner_left': {
-                    'model': identifier_inner,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=north,half=bottom,shape=inner_right': {
-                    'model': identifier_inner,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=north,half=bottom,shape=outer_left': {
-                    'model': identifier_outer,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=north,half=bottom,shape=outer_right': {
-                    'model': identifier_outer,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=north,half=bottom,shape=straight': {
-                    'model': identifier,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=north,half=top,shape=inner_left': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=north,half=top,shape=inner_right': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'uvlock': True
-                },
-                'facing=north,half=top,shape=outer_left': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=north,half=top,shape=outer_right': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'uvlock': True
-                },
-                'facing=north,half=top,shape=straight': {
-                    'model': identifier,
-                    'x': 180,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=south,half=bottom,shape=inner_left': {
-                    'model': identifier_inner
-                },
-                'facing=south,half=bottom,shape=inner_right': {
-                    'model': identifier_inner,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=south,half=bottom,shape=outer_left': {
-                    'model': identifier_outer
-                },
-                'facing=south,half=bottom,shape=outer_right': {
-                    'model': identifier_outer,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=south,half=bottom,shape=straight': {
-                    'model': identifier,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=south,half=top,shape=inner_left': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=south,half=top,shape=inner_right': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=south,half=top,shape=outer_left': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=south,half=top,shape=outer_right': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=south,half=top,shape=straight': {
-                    'model': identifier,
-                    'x': 180,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=west,half=bottom,shape=inner_left': {
-                    'model': identifier_inner,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=west,half=bottom,shape=inner_right': {
-                    'model': identifier_inner,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=west,half=bottom,shape=outer_left': {
-                    'model': identifier_outer,
-                    'y': 90,
-                    'uvlock': True
-                },
-                'facing=west,half=bottom,shape=outer_right': {
-                    'model': identifier_outer,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=west,half=bottom,shape=straight': {
-                    'model': identifier,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=west,half=top,shape=inner_left': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=west,half=top,shape=inner_right': {
-                    'model': identifier_inner,
-                    'x': 180,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=west,half=top,shape=outer_left': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 180,
-                    'uvlock': True
-                },
-                'facing=west,half=top,shape=outer_right': {
-                    'model': identifier_outer,
-                    'x': 180,
-                    'y': 270,
-                    'uvlock': True
-                },
-                'facing=west,half=top,shape=straight': {
-                    'model': identifier,
-                    'x': 180,
-                    'y': 180,
-                    'uvlock': True
-                }
-            }
-        }
+        identifier = self.modid + ':block/' + self.name
+        models = {'straight': identifier}
+        for shape in ('inner_left', 'inner_right', 'outer_left', 'outer_right'):
+            models[shape] = identifier + '_' + shape.split('_')[0]
+        rotations = {'east': 0, 'south': 90, 'west': 180, 'north': 270}
+
+        def variant(state):
+            x = 0
+            y = rotations[state['facing']]
+            if state['half'] == 'top':
+                x = 180
+                if state['shape'].endswith('_right'):
+                    y += 90
+            elif state['shape'].endswith('_left'):
+                y -= 90
+            return BlockState.rotate(models[state['shape']], x, y, uvlock=bool(x or y % 360))
+
+        json_data = BlockState([
+            ('facing', ['east', 'north', 'south', 'west']),
+            ('half', ['bottom', 'top']),
+            ('shape', ['inner_left', 'inner_right', 'outer_left', 'outer_right', 'straight'])
+        ], variant).json_data()
         self.write('blockstates', self.name, json_data)
 
 
 class SlabBlock(Block):
-    def __init__(self, modid, name, lang_dict, origin_block):
-        self.modid = modid
-        self.name = name
-        self.lang_dict = lang_dict
-        self.origin_block = origin_block
+    __slots__ = ('origin_block',)
+    uses_origin = True
 
-        self.write_block_model()
-        self.write_blockstate()
-        self.write_blockitem()
-        self.write_loot_table()
-        self.add_lang()
+    def __init__(self, modid, name, langs_dict, origin_block):
+        self.origin_block = origin_block
+        super().__init__(modid, name, langs_dict)
 
     def write_block_model(self):
         identifier = self.modid + ':blocks/' + self.origin_block
@@ -459,36 +1902,25 @@ class SlabBlock(Block):
 
     def write_blockstate(self):
         identifier = self.modid + ':block/' + self.name
-        identifier_top = identifier + '_top'
-        identifier_origin_block = self.modid + ':block/' + self.origin_block
-        json_data = {
-            'variants': {
-                'type=bottom': {
-                    'model': identifier
-                },
-                'type=double': {
-                    'model': identifier_origin_block
-                },
-                'type=top': {
-                    'model': identifier_top
-                }
-            }
+        models = {
+            'bottom': identifier,
+            'double': self.modid + ':block/' + self.origin_block,
+            'top': identifier + '_top'
         }
+        json_data = BlockState(
+            [('type', ['bottom', 'double', 'top'])],
+            lambda state: BlockState.rotate(models[state['type']])
+        ).json_data()
         self.write('blockstates', self.name, json_data)
 
 
 class WallBlock(Block):
-    def __init__(self, modid, name, lang_dict, origin_block):
-        self.modid = modid
-        self.name = name
-        self.lang_dict = lang_dict
-        self.origin_block = origin_block
+    __slots__ = ('origin_block',)
+    uses_origin = True
 
-        self.write_block_model()
-        self.write_blockstate()
-        self.write_blockitem()
-        self.write_loot_table()
-        self.add_lang()
+    def __init__(self, modid, name, langs_dict, origin_block):
+        self.origin_block = origin_block
+        super().__init__(modid, name, langs_dict)
 
     def write_block_model(self):
         identifier = self.modid + ':blocks/' + self.origin_block
@@ -526,99 +1958,15 @@ class WallBlock(Block):
 
     def write_blockstate(self):
         identifier = self.modid + ':block/' + self.name
-        identifier_post = identifier + '_post'
-        identifier_side = identifier + '_side'
-        identifier_side_tall = identifier_side + '_tall'
-        json_data = {
-            "multipart": [
-                {
-                    "when": {
-                        "up": "true"
-                    },
-                    "apply": {
-                        "model": identifier_post
-                    }
-                },
-                {
-                    "when": {
-                        "north": "low"
-                    },
-                    "apply": {
-                        "model": identifier_side,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "east": "low"
-                    },
-                    "apply": {
-                        "model": identifier_side,
-                        "y": 90,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "south": "low"
-                    },
-                    "apply": {
-                        "model": identifier_side,
-                        "y": 180,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "west": "low"
-                    },
-                    "apply": {
-                        "model": identifier_side,
-                        "y": 270,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "north": "tall"
-                    },
-                    "apply": {
-                        "model": identifier_side_tall,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "east": "tall"
-                    },
-                    "apply": {
-                        "model": identifier_side_tall,
-                        "y": 90,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "south": "tall"
-                    },
-                    "apply": {
-                        "model": identifier_side_tall,
-                        "y": 180,
-                        "uvlock": True
-                    }
-                },
-                {
-                    "when": {
-                        "west": "tall"
-                    },
-                    "apply": {
-                        "model": identifier_side_tall,
-                        "y": 270,
-                        "uvlock": True
-                    }
-                }
-            ]
-        }
+        sides = ('north', 'east', 'south', 'west')
+        parts = [({'up': 'true'}, BlockState.rotate(identifier + '_post'))]
+        for height, model in (('low', identifier + '_side'), ('tall', identifier + '_side_tall')):
+            for rotation, side in enumerate(sides):
+                parts.append(({side: height}, BlockState.rotate(model, y=rotation * 90, uvlock=True)))
+        json_data = BlockState(
+            [('up', ['true', 'false'])] + [(side, ['none', 'low', 'tall']) for side in sides],
+            parts=parts
+        ).json_data()
         self.write('blockstates', self.name, json_data)
 
     def write_blockitem(self):
@@ -629,19 +1977,1636 @@ class WallBlock(Block):
         self.write('models/item', self.name, json_data)
 
 
-json_input = SerialHelper.read()
-modid = json_input.get('modid')
 types = {'block/cube_all': Block, 'item/generated': Item,
-         'block/orientable': OrientableBlock, 'block/stairs': StairsBlock, 'block/wall': WallBlock}
-
-for entry in json_input.get('entries'):
-    parent = entry.get('parent')
-    name = entry.get('name')
-    langs_dict = entry.get('lang')
-    if entry.get('origin_block'):
-        types.get(parent)(modid, name, langs_dict, entry.get('origin_block'))
+         'block/orientable': OrientableBlock, 'block/stairs': StairsBlock, 'block/slab': SlabBlock,
+         'block/wall': WallBlock}
+
+
+def plan_entries(modid, entries, manifest, profiler=None):
+    for entry in entries:
+        entry_hash = None
+        fresh = False
+        if manifest is not None:
+            start = time.perf_counter()
+            if isinstance(entry, CachedEntry):
+                entry_hash = manifest.old_entries[entry.get('name')]['hash']
+                fresh = manifest.is_fresh(entry.get('name'), entry_hash)
+                if not fresh:
+                    entry = entry.load()
+                    entry_hash = Manifest.hash_entry(modid, entry)
+            else:
+                entry_hash = Manifest.hash_entry(modid, entry)
+                fresh = manifest.is_fresh(entry.get('name'), entry_hash)
+            if profiler is not None:
+                profiler.record('manifest', time.perf_counter() - start)
+        yield entry, entry_hash, fresh
+
+
+def render_results(modid, entries, manifest, jobs, encoder, profiler=None, chunksize=64):
+    if profiler is not None:
+        entries = profiler.timed('parse', entries)
+    tasks = plan_entries(modid, entries, manifest, profiler)
+    if jobs <= 1:
+        render = SerialHelper.render if profiler is None else SerialHelper.render_timed
+        for entry, entry_hash, fresh in tasks:
+            result = None if fresh else render(modid, entry, encoder)
+            yield entry, entry_hash, result
+        return
+
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            chunk = list(islice(tasks, chunksize))
+            if chunk:
+                stale = [entry for entry, entry_hash, fresh in chunk if not fresh]
+                in_flight.append((chunk, pool.submit(SerialHelper.render_all, modid, stale, encoder,
+                                                         profiler is not None)))
+                if len(in_flight) < jobs * 2:
+                    continue
+            if not in_flight:
+                return
+            done, future = in_flight.popleft()
+            results = future.result()
+            if profiler is not None:
+                results, state = results
+                profiler.merge(state)
+            results = iter(results)
+            for entry, entry_hash, fresh in done:
+                yield entry, entry_hash, None if fresh else next(results)
+
+
+class ValidationError(ValueError):
+    def __init__(self, errors):
+        self.errors = errors
+        lines = errors[:50]
+        if len(errors) > len(lines):
+            lines.append('... and {count} more'.format(count=len(errors) - len(lines)))
+        super().__init__('{count} invalid entries:\n  '.format(count=len(errors)) + '\n  '.join(lines))
+
+
+class Validator:
+    def __init__(self, header=None):
+        self.names = {}
+        self.origins = []
+        self.errors = []
+        self.count = 0
+        if header is not None and not isinstance(header.get('modid'), str):
+            self.errors.append('input has no modid')
+
+    @staticmethod
+    def run(header, entries):
+        validator = Validator(header)
+        for entry in validator.check(entries):
+            pass
+        validator.finish()
+        return validator
+
+    def check(self, entries):
+        for entry in entries:
+            if self.add(entry):
+                yield entry
+
+    def add(self, entry):
+        index = self.count
+        self.count += 1
+        if not isinstance(entry, (dict, EntryRecord)):
+            self.errors.append('entry #{index} is not an object'.format(index=index))
+            return False
+        name = entry.get('name')
+        if not isinstance(name, str) or not name:
+            self.errors.append('entry #{index} has no name'.format(index=index))
+            return False
+        problems = []
+        if name in self.names:
+            problems.append('has the same name as entry #{first}'.format(first=self.names[name][0]))
+        if isinstance(entry, CachedEntry):
+            self.names.setdefault(name, (index, None))
+            return self.report(index, name, problems)
+
+        parent = entry.get('parent')
+        generator = types.get(parent)
+        self.names.setdefault(name, (index, generator))
+        if generator is None:
+            problems.append('has unknown parent {parent!r}, expected one of {parents}'.format(
+                parent=parent, parents=', '.join(sorted(types))))
+        lang = entry.get('lang')
+        if type(lang) is not dict or any(type(text) is not str for text in lang.values()):
+            problems.append('needs a lang object mapping language codes to names')
+        origin_block = entry.get('origin_block')
+        if generator is None:
+            pass
+        elif generator.uses_origin:
+            if type(origin_block) is not str or not origin_block:
+                problems.append('is a {parent} and needs an origin_block'.format(parent=parent))
+            else:
+                self.origins.append((index, name, origin_block))
+        elif origin_block:
+            problems.append('has an origin_block but {parent} does not use one'.format(parent=parent))
+        return self.report(index, name, problems)
+
+    def report(self, index, name, problems):
+        for problem in problems:
+            self.errors.append('entry #{index} ({name!r}) {problem}'.format(index=index, name=name, problem=problem))
+        return not problems
+
+    def finish(self):
+        for index, name, origin_block in self.origins:
+            origin = self.names.get(origin_block)
+            if origin is None:
+                self.report(index, name, ['has origin_block {origin!r}, which is not an entry'.format(
+                    origin=origin_block)])
+            elif origin[1] is not None and not issubclass(origin[1], Block):
+                self.report(index, name, ['has origin_block {origin!r}, which is not a block'.format(
+                    origin=origin_block)])
+        if self.errors:
+            raise ValidationError(self.errors)
+
+
+class PlanError(ValueError):
+    def __init__(self, conflicts):
+        self.conflicts = conflicts
+        lines = conflicts[:20]
+        if len(conflicts) > len(lines):
+            lines.append('... and {count} more'.format(count=len(conflicts) - len(lines)))
+        super().__init__('{count} conflicting outputs:\n  '.format(count=len(conflicts)) + '\n  '.join(lines))
+
+
+class Plan:
+    def __init__(self, layout):
+        self.layout = layout
+        self.steps = []
+        self.paths = {}
+        self.names = set()
+        self.langs = {}
+        self.duplicates = []
+        self.conflicts = []
+        self.entries_reused = 0
+        self.shared = False
+
+    @staticmethod
+    def build(modid, entries, manifest, jobs, encoder, layout, profiler=None):
+        plan = Plan(layout)
+        for entry, entry_hash, rendered in render_results(modid, entries, manifest, jobs, encoder, profiler):
+            if rendered is None:
+                plan.add(entry.get('name'), entry_hash, None, manifest.old_entries[entry.get('name')]['langs'])
+            else:
+                plan.add(entry.get('name'), entry_hash, *rendered)
+        if plan.entries_reused and isinstance(manifest, Manifest):
+            plan.check_reused(manifest, layout)
+        return plan
+
+    def add(self, name, entry_hash, outputs, langs):
+        if name in self.names:
+            self.duplicates.append('entry {name!r} appears more than once'.format(name=name))
+        self.names.add(name)
+
+        kept = None
+        if outputs is None:
+            self.entries_reused += 1
+        else:
+            kept = []
+            for path, text in outputs:
+                previous = self.paths.get(path)
+                if previous is None:
+                    self.paths[path] = (name, text)
+                    kept.append((path, text))
+                elif previous[1] == text:
+                    self.duplicates.append('{path} is written by both {first!r} and {second!r}'.format(
+                        path=path, first=previous[0], second=name))
+                else:
+                    self.conflicts.append('{path} is written with different content by {first!r} and {second!r}'.format(
+                        path=path, first=previous[0], second=name))
+
+        for lang, lang_dict in langs.items():
+            merged = self.langs.setdefault(lang, {})
+            for key, text in lang_dict.items():
+                if key in merged and merged[key] != text:
+                    self.conflicts.append('lang/{lang}.json key {key!r} has different text in {name!r}'.format(
+                        lang=lang, key=key, name=name))
+                merged[key] = text
+        self.steps.append((name, entry_hash, kept, langs))
+
+    def check_reused(self, manifest, layout):
+        owners = {}
+        for name, entry_hash, outputs, langs in self.steps:
+            if outputs is None:
+                for path in manifest.old_entries[name]['outputs']:
+                    old = manifest.old_outputs.get(path)
+                    if old is not None:
+                        owners[path] = (name, old[0])
+        for path, (name, text) in self.paths.items():
+            owner = owners.get(layout.map(path))
+            if owner is None:
+                continue
+            if Manifest.hash_text(layout.rewrite(text)) == owner[1]:
+                message = '{path} is written by both {first!r} and {second!r}'.format(
+                    path=path, first=owner[0], second=name)
+                problems = self.duplicates
+            else:
+                message = '{path} is written with different content by {first!r} and {second!r}'.format(
+                    path=path, first=owner[0], second=name)
+                problems = self.conflicts
+            if message not in problems:
+                problems.append(message)
+
+    def lang_files(self, encoder):
+        for lang, lang_dict in self.langs.items():
+            yield 'lang/' + lang + '.json', encoder.dumps(lang_dict, sort_keys=True)
+
+    def files(self, encoder, lang=True):
+        for name, entry_hash, outputs, langs in self.steps:
+            if outputs is not None:
+                for path, text in outputs:
+                    yield path, text
+        if lang:
+            for path, text in self.lang_files(encoder):
+                yield path, text
+
+    def execute(self, manifest=None):
+        SerialHelper.output.prepare(path for path in (SerialHelper.layout.map(path) for path in self.paths)
+                                    if path is not None)
+        for name, entry_hash, outputs, langs in self.steps:
+            if self.shared and outputs is not None and manifest is not None and manifest.is_fresh(name, entry_hash):
+                outputs = None
+                SerialHelper.result.entries_reused += 1
+            if outputs is None:
+                manifest.reuse(name, add_langs=False)
+                continue
+            if manifest is not None:
+                manifest.begin(name, entry_hash)
+            for path, text in outputs:
+                SerialHelper.write_text(path, text)
+            if manifest is not None:
+                for lang, lang_dict in langs.items():
+                    manifest.record_lang(lang, lang_dict)
+                manifest.end()
+        if SerialHelper.lang_builder is not None:
+            for lang, lang_dict in self.langs.items():
+                SerialHelper.lang_builder.add(lang, lang_dict)
+        else:
+            SerialHelper.langs_dictionairy = self.langs
+
+
+class TextureIndex:
+    def __init__(self, root, modid, jobs=1):
+        self.root = root
+        self.modid = modid
+        self.jobs = jobs
+        self.textures = set()
+        self.references = {}
+
+    def scan(self):
+        if not os.path.isdir(self.root):
+            raise FileNotFoundError('Texture directory {path} does not exist'.format(path=self.root))
+        dirs = []
+        for item in os.scandir(self.root):
+            if item.is_dir():
+                dirs.append((item.path, item.name + '/'))
+            elif item.name.endswith('.png'):
+                self.textures.add(item.name[:-4])
+        if self.jobs > 1 and len(dirs) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                for textures in pool.map(TextureIndex.scan_dir, dirs):
+                    self.textures.update(textures)
+        else:
+            for textures in map(TextureIndex.scan_dir, dirs):
+                self.textures.update(textures)
+        return self
+
+    @staticmethod
+    def scan_dir(item):
+        textures = []
+        stack = [item]
+        while stack:
+            path, prefix = stack.pop()
+            for item in os.scandir(path):
+                if item.is_dir():
+                    stack.append((item.path, prefix + item.name + '/'))
+                elif item.name.endswith('.png'):
+                    textures.append(prefix + item.name[:-4])
+        return textures
+
+    @staticmethod
+    def is_model(path):
+        return path.startswith('models/') or '/models/' in path
+
+    def fork(self):
+        index = TextureIndex(self.root, self.modid, self.jobs)
+        index.textures = self.textures
+        return index
+
+    def add(self, name, path, text):
+        if TextureIndex.is_model(path):
+            self.add_model(name, json.loads(text))
+
+    def add_written(self, name, paths, root):
+        for path in paths:
+            if TextureIndex.is_model(path):
+                with open(os.path.join(root, path), 'r', encoding='utf-8') as json_file:
+                    self.add_model(name, json.load(json_file))
+
+    def add_model(self, name, json_data):
+        for identifier in json_data.get('textures', {}).values():
+            self.references.setdefault(identifier, []).append(name)
+
+    def report(self):
+        missing = {}
+        used = set()
+        for identifier, names in self.references.items():
+            namespace, separator, texture = identifier.rpartition(':')
+            if (namespace or 'minecraft') != self.modid:
+                continue
+            used.add(texture)
+            if texture not in self.textures:
+                missing[identifier] = sorted(set(names))
+        return {
+            'missing': dict(sorted(missing.items())),
+            'unused': sorted(self.modid + ':' + texture for texture in self.textures - used)
+        }
+
+
+def check_outputs(root, files, dirs, jobs=1, diff_lines=6):
+    def compare(item):
+        path, text = item
+        full_path = os.path.join(root, path)
+        data = text.encode('utf-8')
+        try:
+            with open(full_path, 'rb') as json_file:
+                if os.fstat(json_file.fileno()).st_size == len(data) and json_file.read() == data:
+                    return None
+        except FileNotFoundError:
+            return 'missing', path, []
+        with open(full_path, 'r', encoding='utf-8', errors='replace') as json_file:
+            lines = difflib.unified_diff(json_file.read().splitlines(), text.splitlines(), lineterm='', n=0)
+            lines = [line for line in lines if not line.startswith(('---', '+++', '@@'))]
+        if len(lines) > diff_lines:
+            lines = lines[:diff_lines] + ['... {count} more lines'.format(count=len(lines) - diff_lines)]
+        return 'differs', path, lines
+
+    if jobs > 1:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            drift = [item for item in pool.map(compare, files.items(), chunksize=64) if item is not None]
+    else:
+        drift = [item for item in map(compare, files.items()) if item is not None]
+
+    for dir in sorted(dirs):
+        try:
+            names = sorted(os.listdir(os.path.join(root, dir)))
+        except FileNotFoundError:
+            continue
+        for name in names:
+            path = dir + '/' + name if dir else name
+            if name.endswith('.json') and path not in files:
+                drift.append(('extra', path, []))
+    return drift
+
+
+class Options:
+    def __init__(self, incremental=False, manifest='.mc_json_helper_manifest.json', jobs=1,
+                 encoder='json', minify=False, layout='flat', pack_format=None,
+                 zip=None, compression='deflated', compress_level=None,
+                 profile=False, profile_memory=False, profile_callback=None, memory_callback=None,
+                 plan=True, dry_run=False, lang_merge=True, lang_spill_keys=None, validate=True,
+                 textures=None, check=False, staged=False, input_cache=False, writer='sync',
+                 write_concurrency=32, version='default'):
+        self.incremental = incremental
+        self.manifest = manifest
+        self.jobs = jobs
+        self.encoder = encoder
+        self.minify = minify
+        self.layout = layout
+        self.pack_format = pack_format
+        self.zip = zip
+        self.compression = compression
+        self.compress_level = compress_level
+        self.profile = profile
+        self.profile_memory = profile_memory
+        self.profile_callback = profile_callback
+        self.memory_callback = memory_callback
+        self.plan = plan
+        self.dry_run = dry_run
+        self.lang_merge = lang_merge
+        self.lang_spill_keys = lang_spill_keys
+        self.validate = validate
+        self.textures = textures
+        self.check = check
+        self.staged = staged
+        self.input_cache = input_cache
+        self.writer = writer
+        self.write_concurrency = write_concurrency
+        self.version = version
+
+
+class GenerateResult:
+    def __init__(self, modid, output_root):
+        self.modid = modid
+        self.output_root = output_root
+        self.entries = 0
+        self.entries_reused = 0
+        self.files_written = 0
+        self.files_unchanged = 0
+        self.files_deleted = 0
+        self.langs = []
+        self.duplicates = []
+        self.planned = None
+        self.textures = None
+        self.drift = None
+        self.profile = None
+
+
+def generate(input='input.json', output_root='.', options=None):
+    options = options or Options()
+    if (options.dry_run or options.check) and not options.plan:
+        raise ValueError('A dry run or check needs the planning stage')
+    if options.check and options.zip:
+        raise ValueError('Checking compares against a directory, not a zip archive')
+    check_target(options)
+    encoder = get_encoder(options.encoder, options.minify)
+
+    manifest = None
+    if options.incremental:
+        manifest = Manifest(os.path.join(output_root, options.manifest), output_root, target_settings(options, encoder))
+
+    fresh = None if options.check else manifest
+    source, header, entries = open_input(input, options, fresh)
+    validator = None
+    if options.validate and not isinstance(source, InputCache):
+        validator = Validator(header)
+        if not options.plan or validator.errors:
+            Validator.run(header, entries)
+            source, header, entries = open_input(input, options, fresh)
+            validator = None
+    modid = header.get('modid')
+    result = GenerateResult(modid, output_root)
+    layout = get_layout(options, modid, encoder)
+    if manifest is not None:
+        manifest.modid = modid
+    profiler = None
+    if options.profile or options.profile_memory or options.profile_callback or options.memory_callback:
+        profiler = Profiler(options.profile_callback, options.profile_memory, options.memory_callback)
+        profiler.start()
+    textures = None
+    if options.textures:
+        start = time.perf_counter()
+        textures = TextureIndex(options.textures, modid, options.jobs).scan()
+        if profiler is not None:
+            profiler.record('textures', time.perf_counter() - start)
+
+    started = time.perf_counter()
+    plan = None
+    if options.plan:
+        SerialHelper.reset(None, layout, None, None, encoder, profiler)
+        try:
+            if validator is not None:
+                entries = validator.check(entries)
+            plan = Plan.build(modid, entries, fresh, options.jobs, encoder, layout, profiler)
+        finally:
+            SerialHelper.reset()
+        if validator is not None:
+            validator.finish()
+        if profiler is not None:
+            profiler.record('plan', time.perf_counter() - started)
+            profiler.snapshot('plan')
+        result.entries = len(plan.steps)
+        result.entries_reused = plan.entries_reused
+        result.duplicates = plan.duplicates
+        result.langs = sorted(plan.langs)
+        if plan.conflicts:
+            raise PlanError(plan.conflicts)
+        if textures is not None:
+            for name, entry_hash, outputs, langs in plan.steps:
+                if outputs is None:
+                    textures.add_written(name, manifest.old_entries[name]['outputs'], output_root)
+                else:
+                    for path, text in outputs:
+                        textures.add(name, path, layout.rewrite(text))
+            result.textures = textures.report()
+        if options.dry_run:
+            result.planned = []
+            for name, entry_hash, outputs, langs in plan.steps:
+                if outputs is None:
+                    result.files_unchanged += len(manifest.old_entries[name]['outputs'])
+            for path, text in plan.files(encoder):
+                path = layout.map(path)
+                if path is None:
+                    continue
+                text = layout.rewrite(text)
+                changed = manifest is None or manifest.record_output(path, text)
+                result.planned.append((path, len(text.encode('utf-8')), changed))
+                if changed:
+                    result.files_written += 1
+                else:
+                    result.files_unchanged += 1
+            for path, json_data in layout.extra_files():
+                result.planned.append((path, len(encoder.dumps(json_data).encode('utf-8')), True))
+                result.files_written += 1
+            if profiler is not None:
+                profiler.stop()
+                result.profile = profiler.report()
+            return result
+        if options.check:
+            start = time.perf_counter()
+            files = {}
+            dirs = set()
+            for folder in ('blockstates', 'models/block', 'models/item', 'loot_tables', 'lang'):
+                path = layout.map(folder + '/_.json')
+                if path is not None:
+                    dirs.add(path.rpartition('/')[0])
+            for path, text in plan.files(encoder, lang=False):
+                path = layout.map(path)
+                if path is not None:
+                    files[path] = layout.rewrite(text)
+            for path, json_data in layout.extra_files():
+                files[path] = encoder.dumps(json_data)
+            builder = LangBuilder(encoder, layout, output_root, options.lang_merge, options.jobs,
+                                  options.lang_spill_keys)
+            for lang, lang_dict in plan.langs.items():
+                builder.add(lang, lang_dict)
+            for lang, text in builder.build_all():
+                path = layout.map('lang/' + lang + '.json')
+                if path is not None:
+                    files[path] = text
+            result.drift = check_outputs(output_root, files, dirs, options.jobs)
+            result.files_unchanged = len(files) - sum(1 for status, path, lines in result.drift
+                                                      if status != 'extra')
+            if profiler is not None:
+                profiler.record('check', time.perf_counter() - start)
+                profiler.stop()
+                result.profile = profiler.report()
+            return result
+
+    emit_outputs(plan, entries, source, output_root, options, encoder, layout, manifest, result,
+                 profiler, textures)
+
+    if profiler is not None:
+        profiler.record('total', time.perf_counter() - started)
+        profiler.stop()
+        result.profile = profiler.report()
+
+    return result
+
+
+def check_target(options):
+    if options.staged and options.zip:
+        raise ValueError('Staged output needs a directory output, not a zip archive')
+    if options.writer not in ('sync', 'async'):
+        raise ValueError('Unknown writer {name}, expected async or sync'.format(name=options.writer))
+    if options.writer == 'async' and options.zip:
+        raise ValueError('The async writer needs a directory output, not a zip archive')
+    if options.layout not in layouts:
+        raise ValueError('Unknown layout {name}, expected one of {names}'.format(
+            name=options.layout, names=', '.join(sorted(layouts))))
+    if options.version not in versions:
+        raise ValueError('Unknown game version {name}, expected one of {names}'.format(
+            name=options.version, names=', '.join(sorted(versions))))
+    if options.incremental and options.zip:
+        raise ValueError('Incremental builds need a directory output, not a zip archive')
+
+
+def target_settings(options, encoder):
+    settings = encoder.key + ':' + options.layout
+    if options.version != GameVersion.name:
+        settings += ':' + options.version
+    return settings
+
+
+def emit_outputs(plan, entries, source, output_root, options, encoder, layout, manifest, result,
+                 profiler=None, textures=None, shared_langs=None):
+    if options.zip:
+        output = ZipOutput(os.path.join(output_root, options.zip),
+                           options.compression, options.compress_level)
+    elif options.staged:
+        folders = (layout.map(folder + '/_.json') for folder in ('models', 'blockstates', 'loot_tables', 'lang'))
+        tops = set(path.split('/', 1)[0] for path in folders if path is not None)
+        tops.update(path for path, json_data in layout.extra_files())
+        output = StagedOutput(output_root, sorted(tops))
+    else:
+        output = DirectoryOutput(output_root)
+    SerialHelper.reset(output, layout, manifest, result, encoder, profiler)
+    SerialHelper.lang_builder = LangBuilder(encoder, layout, None if options.zip else output_root,
+                                            options.lang_merge, options.jobs, options.lang_spill_keys,
+                                            shared_langs)
+
+    try:
+        if options.writer == 'async':
+            SerialHelper.writer = AsyncWriter(output, options.write_concurrency)
+        elif options.jobs > 1 and output.concurrent:
+            SerialHelper.writer = ThreadPoolExecutor(max_workers=options.jobs)
+        if plan is not None:
+            start = time.perf_counter()
+            plan.execute(manifest)
+            if profiler is not None:
+                profiler.record('execute', time.perf_counter() - start)
+        else:
+            stream_entries(result.modid, entries, manifest, options.jobs, encoder, result, profiler, textures)
+            result.langs = SerialHelper.lang_builder.langs()
+            if textures is not None:
+                result.textures = textures.report()
+
+        if profiler is not None:
+            profiler.snapshot('entries')
+        if manifest is not None:
+            for lang, keys in manifest.stale_langs():
+                SerialHelper.lang_builder.remove(lang, keys)
+        SerialHelper.write_lang_file()
+        SerialHelper.write_extra_files()
+        start = time.perf_counter()
+        SerialHelper.flush_writes()
+        if profiler is not None:
+            profiler.record('flush', time.perf_counter() - start)
+        if options.staged:
+            start = time.perf_counter()
+            output.commit()
+            if profiler is not None:
+                profiler.record('commit', time.perf_counter() - start)
+        SerialHelper.lang_builder.save()
+        if manifest is not None:
+            for path in manifest.stale_outputs():
+                try:
+                    os.remove(os.path.join(output_root, path))
+                    result.files_deleted += 1
+                except FileNotFoundError:
+                    pass
+            if isinstance(source, ShardedInput):
+                manifest.shards = source.records
+            manifest.stamp()
+            manifest.save()
+    finally:
+        if SerialHelper.writer is not None:
+            SerialHelper.writer.shutdown()
+        if SerialHelper.lang_builder is not None:
+            SerialHelper.lang_builder.close()
+        output.close()
+        SerialHelper.reset()
+
+
+def generate_targets(input='input.json', targets=(), options=None):
+    options = options or Options()
+    if options.dry_run or options.check or not options.plan:
+        raise ValueError('Several targets need the planning stage and cannot be combined with a dry run or check')
+    encoder = get_encoder(options.encoder, options.minify)
+    tasks = []
+    for target in targets:
+        target_options = copy.copy(options)
+        output_root = target.get('output', '.')
+        for key, value in target.get('options', {}).items():
+            if key in ('encoder', 'minify', 'jobs', 'validate', 'input_cache', 'textures', 'plan'):
+                raise ValueError('{key!r} is shared by all targets and cannot be set for {output}'.format(
+                    key=key, output=output_root))
+            if not hasattr(target_options, key):
+                raise ValueError('Unknown option {key!r} for {output}'.format(key=key, output=output_root))
+            setattr(target_options, key, value)
+        check_target(target_options)
+        tasks.append((output_root, target_options))
+    if not tasks:
+        raise ValueError('No targets given')
+    roots = [os.path.abspath(output_root) for output_root, target_options in tasks]
+    if len(set(roots)) != len(roots):
+        raise ValueError('Every target needs its own output directory')
+
+    source, header, entries = open_input(input, options)
+    validator = None
+    if options.validate and not isinstance(source, InputCache):
+        validator = Validator(header)
+        if validator.errors:
+            Validator.run(header, entries)
+    modid = header.get('modid')
+    profiler = None
+    if options.profile or options.profile_memory or options.profile_callback or options.memory_callback:
+        profiler = Profiler(options.profile_callback, options.profile_memory, options.memory_callback)
+        profiler.start()
+
+    started = time.perf_counter()
+    manifests = []
+    for output_root, target_options in tasks:
+        manifest = None
+        if target_options.incremental:
+            manifest = Manifest(os.path.join(output_root, target_options.manifest), output_root,
+                                target_settings(target_options, encoder))
+            manifest.modid = modid
+        manifests.append(manifest)
+    hasher = None
+    if None not in manifests and not options.textures:
+        hasher = ManifestSet(manifests)
+    elif any(manifests):
+        hasher = Manifest(os.devnull)
+    SerialHelper.reset(None, Layout(modid), None, None, encoder, profiler)
+    try:
+        if validator is not None:
+            entries = validator.check(entries)
+        plan = Plan.build(modid, entries, hasher, options.jobs, encoder, Layout(modid), profiler)
+    finally:
+        SerialHelper.reset()
+    if validator is not None:
+        validator.finish()
+    if profiler is not None:
+        profiler.record('plan', time.perf_counter() - started)
+    if plan.entries_reused:
+        for (output_root, target_options), manifest in zip(tasks, manifests):
+            plan.check_reused(manifest, get_layout(target_options, modid, encoder))
+    if plan.conflicts:
+        raise PlanError(plan.conflicts)
+    plan.shared = True
+    textures = None
+    if options.textures:
+        start = time.perf_counter()
+        textures = TextureIndex(options.textures, modid, options.jobs).scan()
+        if profiler is not None:
+            profiler.record('textures', time.perf_counter() - start)
+
+    results = []
+    shared_langs = {}
+    for (output_root, target_options), manifest in zip(tasks, manifests):
+        layout = get_layout(target_options, modid, encoder)
+        result = GenerateResult(modid, output_root)
+        result.entries = len(plan.steps)
+        result.entries_reused = plan.entries_reused
+        result.duplicates = plan.duplicates
+        result.langs = sorted(plan.langs)
+        if textures is not None:
+            start = time.perf_counter()
+            index = textures.fork()
+            for name, entry_hash, outputs, langs in plan.steps:
+                for path, text in outputs:
+                    index.add(name, path, layout.rewrite(text))
+            result.textures = index.report()
+            if profiler is not None:
+                profiler.record('textures', time.perf_counter() - start)
+        emit_outputs(plan, None, source, output_root, target_options, encoder, layout, manifest, result,
+                     profiler, None, shared_langs)
+        results.append(result)
+
+    if profiler is not None:
+        profiler.record('total', time.perf_counter() - started)
+        profiler.stop()
+        profile = profiler.report()
+        for result in results:
+            result.profile = profile
+    return results
+
+
+def read_targets(specs):
+    targets = []
+    for output_root, layout, version in specs:
+        targets.append({'output': output_root, 'options': {'layout': layout, 'version': version}})
+    return targets
+
+
+def read_batch(path):
+    with open(path, 'r', encoding='utf-8') as json_file:
+        data = json.load(json_file)
+    base = os.path.dirname(path)
+    mods = []
+    for index, mod in enumerate(data.get('mods', []) if isinstance(data, dict) else data):
+        if isinstance(mod, str):
+            mod = {'input': mod}
+        input = mod.get('input')
+        if isinstance(input, str):
+            input = os.path.join(base, input)
+        elif not isinstance(input, dict):
+            raise ValueError('{path}: mod #{index} needs an input file or an inline input object'.format(
+                path=path, index=index))
+        output = mod.get('output')
+        if output is not None:
+            output = os.path.join(base, output)
+        elif isinstance(input, str):
+            output = os.path.dirname(input)
+        else:
+            output = os.path.join(base, '.')
+        mods.append({'input': input, 'output': output, 'options': mod.get('options', {})})
+    return mods
+
+
+def generate_batch(mods, options=None):
+    options = options or Options()
+    tasks = []
+    for mod in mods:
+        mod_options = copy.copy(options)
+        for key, value in mod.get('options', {}).items():
+            if not hasattr(mod_options, key):
+                raise ValueError('Unknown option {key!r} for {input}'.format(key=key, input=mod.get('input')))
+            setattr(mod_options, key, value)
+        tasks.append((mod.get('input'), mod.get('output', '.'), mod_options))
+    if options.jobs <= 1 or len(tasks) <= 1:
+        return [generate_batch_mod(task) for task in tasks]
+    for input, output, mod_options in tasks:
+        mod_options.jobs = 1
+    with ProcessPoolExecutor(max_workers=options.jobs) as pool:
+        return list(pool.map(generate_batch_mod, tasks))
+
+
+def generate_batch_mod(task):
+    input, output, options = task
+    try:
+        return generate(input, output, options), None
+    except (ValueError, OSError) as error:
+        return None, str(error)
+
+
+def open_input(input, options, manifest=None):
+    if isinstance(input, dict):
+        return None, input, iter(input.get('entries', ()))
+    if os.path.isdir(input):
+        source = ShardedInput(input, options.jobs)
+        header, entries = source.read(manifest)
+        return source, header, entries
+    if options.input_cache and os.path.isfile(input):
+        source = InputCache(input)
+        header, catalogue = source.load(options.validate)
+        return source, header, catalogue.records()
+    header, entries = SerialHelper.stream(input)
+    return None, header, entries
+
+
+def stream_entries(modid, entries, manifest, jobs, encoder, result, profiler=None, textures=None):
+    for entry, entry_hash, rendered in render_results(modid, entries, manifest, jobs, encoder, profiler):
+        name = entry.get('name')
+        result.entries += 1
+        if rendered is None:
+            if textures is not None:
+                textures.add_written(name, manifest.old_entries[name]['outputs'], manifest.root)
+            manifest.reuse(name)
+            result.entries_reused += 1
+            continue
+        outputs, langs = rendered
+        if manifest is not None:
+            manifest.begin(name, entry_hash)
+        for path, text in outputs:
+            SerialHelper.write_text(path, text)
+            if textures is not None:
+                textures.add(name, path, SerialHelper.layout.rewrite(text))
+        start = time.perf_counter()
+        for lang, lang_dict in langs.items():
+            SerialHelper.add_to_langs_dict(lang, lang_dict)
+        if profiler is not None:
+            profiler.record('lang', time.perf_counter() - start)
+        if manifest is not None:
+            manifest.end()
+
+
+class Watcher:
+    def __init__(self, input='input.json', output_root='.', options=None, interval=0.1):
+        self.input = input
+        self.output_root = output_root
+        self.options = options or Options()
+        self.interval = interval
+        self.encoder = get_encoder(self.options.encoder, self.options.minify)
+        self.output = DirectoryOutput(output_root)
+        self.modid = None
+        self.layout = None
+        self.entries = {}
+        self.owners = {}
+        self.langs = {}
+        self.signature = None
+        self.source = None
+        if os.path.isdir(input):
+            self.source = ShardedInput(input, keep=True)
+
+    def stat(self):
+        try:
+            if self.source is not None:
+                return self.source.signature()
+            stat = os.stat(self.input)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self):
+        if self.source is None:
+            return SerialHelper.read(self.input)
+        header, entries = self.source.read()
+        return dict(header, entries=list(entries))
+
+    def build(self):
+        if self.options.zip:
+            raise ValueError('Watch mode needs a directory output, not a zip archive')
+        self.signature = self.stat()
+        document = self.read()
+        result = generate(document, self.output_root, self.options)
+        self.modid = document.get('modid')
+        self.layout = get_layout(self.options, self.modid, self.encoder)
+        self.entries = {}
+        self.owners = {}
+        for entry in document.get('entries'):
+            rendered = self.render(entry)
+            del rendered['texts']
+            for path in rendered['outputs']:
+                self.owners.setdefault(path, entry.get('name'))
+            self.entries[entry.get('name')] = rendered
+        self.langs = {}
+        for lang in result.langs:
+            path = self.layout.map('lang/' + lang + '.json')
+            if path is None:
+                continue
+            with open(os.path.join(self.output_root, path), 'r', encoding='utf-8') as json_file:
+                self.langs[lang] = json.load(json_file)
+        return result
+
+    def render(self, entry):
+        name = entry.get('name')
+        outputs, langs = SerialHelper.render(self.modid, entry, self.encoder)
+        outputs = [(path, self.layout.rewrite(text)) for path, text in outputs]
+        hashes = {}
+        for path, text in outputs:
+            hashes[path] = Manifest.hash_text(text)
+        return {'entry': entry, 'outputs': hashes, 'texts': outputs, 'langs': langs}
+
+    def check_conflicts(self, entries, rendered):
+        conflicts = []
+        claimed = {}
+        for name, new in rendered.items():
+            for path, digest in new['outputs'].items():
+                owner = self.owners.get(path)
+                if owner is not None and owner != name and owner in entries and owner not in rendered:
+                    first = (owner, self.entries[owner]['outputs'][path])
+                else:
+                    first = claimed.setdefault(path, (name, digest))
+                if first[0] != name and first[1] != digest:
+                    conflicts.append('{path} is written with different content by {first!r} and {second!r}'.format(
+                        path=path, first=first[0], second=name))
+        if conflicts:
+            raise PlanError(conflicts)
+
+    def update(self):
+        started = time.perf_counter()
+        self.signature = self.stat()
+        document = self.read()
+        if self.options.validate:
+            Validator.run(document, document.get('entries'))
+        if document.get('modid') != self.modid:
+            self.build()
+            return 'modid changed, rebuilt everything'
+
+        entries = {}
+        for entry in document.get('entries'):
+            entries[entry.get('name')] = entry
+        removed = [name for name in self.entries if name not in entries]
+        changed = [name for name, entry in entries.items()
+                   if name not in self.entries or self.entries[name]['entry'] != entry]
+        rendered_entries = {}
+        for name in changed:
+            rendered_entries[name] = self.render(entries[name])
+        self.check_conflicts(entries, rendered_entries)
+
+        written = 0
+        deleted = 0
+        dirty_langs = set()
+        previous = {}
+        for name in removed + changed:
+            old = self.entries.pop(name, None)
+            if old is None:
+                continue
+            previous[name] = old
+            for path in old['outputs']:
+                if self.owners.get(path) == name:
+                    del self.owners[path]
+            for lang, lang_dict in old['langs'].items():
+                table = self.langs.get(lang, {})
+                for key in lang_dict:
+                    table.pop(key, None)
+                dirty_langs.add(lang)
+
+        for name in changed:
+            rendered = rendered_entries[name]
+            old_outputs = previous.get(name, {}).get('outputs', {})
+            for path, text in rendered.pop('texts'):
+                self.owners.setdefault(path, name)
+                mapped = self.layout.map(path)
+                if mapped is not None and old_outputs.get(path) != rendered['outputs'][path]:
+                    self.output.write(mapped, text)
+                    written += 1
+            for lang, lang_dict in rendered['langs'].items():
+                self.langs.setdefault(lang, {}).update(lang_dict)
+                dirty_langs.add(lang)
+            self.entries[name] = rendered
+
+        for old in previous.values():
+            for path in old['outputs']:
+                if path not in self.owners:
+                    deleted += self.delete(path)
+
+        for lang in sorted(dirty_langs):
+            path = self.layout.map('lang/' + lang + '.json')
+            if path is not None:
+                self.output.write(path, self.encoder.dumps(self.langs.get(lang, {}), sort_keys=True))
+                written += 1
+        if dirty_langs:
+            generated = {}
+            for rendered in self.entries.values():
+                for lang, lang_dict in rendered['langs'].items():
+                    generated.setdefault(lang, set()).update(lang_dict)
+            LangBuilder.save_keys(self.output_root, dict((lang, sorted(keys)) for lang, keys in generated.items()))
+
+        if self.options.incremental and (written or deleted):
+            manifest_path = os.path.join(self.output_root, self.options.manifest)
+            if os.path.isfile(manifest_path):
+                os.remove(manifest_path)
+
+        return '{changed} changed, {removed} removed, {written} files written, {deleted} deleted in {ms:.1f} ms'.format(
+            changed=len(changed), removed=len(removed), written=written, deleted=deleted,
+            ms=(time.perf_counter() - started) * 1000)
+
+    def delete(self, path):
+        path = self.layout.map(path)
+        if path is None:
+            return 0
+        try:
+            os.remove(os.path.join(self.output_root, path))
+        except FileNotFoundError:
+            return 0
+        return 1
+
+    def run(self, callback=print):
+        result = self.build()
+        callback('{modid}: {entries} entries, {written} files written, watching {input}'.format(
+            modid=result.modid, entries=result.entries, written=result.files_written, input=self.input))
+        while True:
+            time.sleep(self.interval)
+            signature = self.stat()
+            if signature is None or signature == self.signature:
+                continue
+            time.sleep(self.interval / 2)
+            if self.stat() != signature:
+                continue
+            try:
+                callback(self.update())
+            except (ValueError, PlanError) as error:
+                self.signature = signature
+                callback('error: {error}'.format(error=error))
+
+
+class DevServer(Watcher):
+    folders = ('models', 'blockstates', 'loot_tables', 'lang')
+
+    def __init__(self, input='input.json', options=None, cache_size=1024):
+        super().__init__(input, None, options)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.lang_tables = None
+        self.prefixes = []
+        self.extra = {}
+        self.error = None
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        self.signature = self.stat()
+        header, entries = SerialHelper.stream(self.input)
+        validator = None
+        if self.options.validate:
+            validator = Validator(header)
+            entries = validator.check(entries)
+        catalogue = Catalogue(header.get('modid'))
+        for entry in entries:
+            catalogue.add(entry)
+        if validator is not None:
+            validator.finish()
+        return catalogue
+
+    def build(self):
+        catalogue = self.load()
+        self.modid = catalogue.modid
+        self.layout = get_layout(self.options, self.modid, self.encoder)
+        self.entries = catalogue.index()
+        self.cache = OrderedDict()
+        self.lang_tables = None
+        self.prefixes = []
+        for folder in DevServer.folders:
+            path = self.layout.map(folder + '/_.json')
+            if path is not None:
+                self.prefixes.append((path[:-len('_.json')], folder + '/'))
+        self.extra = {path: self.encoder.dumps(json_data) for path, json_data in self.layout.extra_files()}
+        return '{modid}: {entries} entries'.format(modid=self.modid, entries=len(self.entries))
+
+    def update(self):
+        catalogue = self.load()
+        if catalogue.modid != self.modid:
+            return self.build()
+        entries = catalogue.index()
+        removed = [name for name in self.entries if name not in entries]
+        changed = [name for name, record in entries.items()
+                   if name not in self.entries or self.entries[name].key() != record.key()]
+        for name in removed + changed:
+            old = self.cache.pop(name, None)
+            if self.lang_tables is not None and name in self.entries:
+                if old is None:
+                    old = self.render(self.entries[name])
+                for lang, lang_dict in old['langs'].items():
+                    for key in lang_dict:
+                        self.lang_tables.get(lang, {}).pop(key, None)
+        self.entries = entries
+        for name in changed:
+            if self.lang_tables is not None:
+                for lang, lang_dict in self.rendered(name)['langs'].items():
+                    self.lang_tables.setdefault(lang, {}).update(lang_dict)
+        return '{changed} changed, {removed} removed'.format(changed=len(changed), removed=len(removed))
+
+    def refresh(self):
+        signature = self.stat()
+        if signature is None or signature == self.signature:
+            return None
+        try:
+            message = self.update()
+        except ValueError as error:
+            self.signature = signature
+            self.error = str(error)
+            return 'error: ' + self.error
+        self.error = None
+        return message
+
+    def render(self, entry):
+        outputs, langs = SerialHelper.render(self.modid, entry, self.encoder)
+        return {'texts': {path: self.layout.rewrite(text) for path, text in outputs}, 'langs': langs}
+
+    def rendered(self, name):
+        rendered = self.cache.get(name)
+        if rendered is not None:
+            self.cache.move_to_end(name)
+            self.hits += 1
+            return rendered
+        self.misses += 1
+        rendered = self.render(self.entries[name])
+        self.cache[name] = rendered
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return rendered
+
+    def tables(self):
+        if self.lang_tables is None:
+            self.lang_tables = {}
+            for entry in self.entries.values():
+                for lang, lang_dict in SerialHelper.render(self.modid, entry, self.encoder)[1].items():
+                    self.lang_tables.setdefault(lang, {}).update(lang_dict)
+        return self.lang_tables
+
+    def lookup(self, path):
+        path = path.split('?', 1)[0].lstrip('/')
+        if path in self.extra:
+            return self.extra[path]
+        for prefix, folder in self.prefixes:
+            if path.startswith(prefix) and path.endswith('.json'):
+                path = folder + path[len(prefix):]
+                break
+        else:
+            return None
+        if path.startswith('lang/'):
+            table = self.tables().get(path[len('lang/'):-len('.json')])
+            return self.encoder.dumps(table, sort_keys=True) if table is not None else None
+        name = path.rsplit('/', 1)[-1][:-len('.json')]
+        while True:
+            if name in self.entries:
+                text = self.rendered(name)['texts'].get(path)
+                if text is not None:
+                    return text
+            if '_' not in name:
+                return None
+            name = name.rsplit('_', 1)[0]
+
+    def status(self):
+        return self.encoder.dumps({
+            'modid': self.modid,
+            'entries': len(self.entries),
+            'cached': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'error': self.error
+        })
+
+    def serve(self, host='127.0.0.1', port=8000, callback=print):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                message = server.refresh()
+                if message is not None:
+                    callback(message)
+                if self.path == '/':
+                    self.send_text(200, server.status())
+                elif server.error is not None:
+                    self.send_text(500, server.error)
+                else:
+                    text = server.lookup(self.path)
+                    if text is None:
+                        self.send_text(404, 'Not found: ' + self.path)
+                    else:
+                        self.send_text(200, text)
+
+            def send_text(self, code, text):
+                body = text.encode('utf-8')
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json; charset=utf-8' if code == 200
+                                 else 'text/plain; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        callback(self.build() + ', serving on http://{host}:{port}/'.format(host=host, port=port))
+        httpd = HTTPServer((host, port), Handler)
+        try:
+            httpd.serve_forever()
+        finally:
+            httpd.server_close()
+
+
+class Importer:
+    folders = ('blockstates', 'models/block', 'models/item', 'loot_tables', 'lang')
+
+    def __init__(self, root, layout='flat', modid=None, jobs=1, version='default'):
+        if layout not in layouts:
+            raise ValueError('Unknown layout {name}, expected one of {names}'.format(
+                name=layout, names=', '.join(sorted(layouts))))
+        if version not in versions:
+            raise ValueError('Unknown game version {name}, expected one of {names}'.format(
+                name=version, names=', '.join(sorted(versions))))
+        self.root = root
+        self.layout = layout
+        self.version = version
+        self.modid = modid
+        self.jobs = jobs
+        self.files = {}
+        self.parsed = {}
+        self.encoder = JsonEncoder()
+        self.used = set()
+        self.langs = {}
+        self.used_keys = set()
+
+    def infer_modid(self):
+        if self.layout != 'flat':
+            assets = os.path.join(self.root, 'assets')
+            namespaces = sorted(os.listdir(assets)) if os.path.isdir(assets) else []
+        else:
+            counts = {}
+            for path in self.files:
+                json_data = self.data(path) if path.startswith('blockstates/') else None
+                if isinstance(json_data, dict):
+                    variants = json_data.get('variants') or {}
+                    for variant in variants.values():
+                        if isinstance(variant, dict) and ':' in variant.get('model', ''):
+                            namespace = variant['model'].split(':', 1)[0]
+                            counts[namespace] = counts.get(namespace, 0) + 1
+            namespaces = sorted(counts, key=counts.get, reverse=True)[:1]
+        if len(namespaces) != 1:
+            raise ValueError('Cannot tell the modid of {root}, found {namespaces}'.format(
+                root=self.root, namespaces=', '.join(namespaces) or 'nothing'))
+        return namespaces[0]
+
+    def folder(self, layout, folder):
+        path = layout.map(folder + '/_.json')
+        return path[:-len('_.json')] if path is not None else None
+
+    def scan(self, layout):
+        folders = [folder for folder in (self.folder(layout, folder) for folder in Importer.folders)
+                   if folder is not None]
+        if self.jobs > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+                paths = [path for paths in pool.map(self.list_folder, folders) for path in paths]
+                for chunk in pool.map(self.read_files, [paths[start:start + 256]
+                                                        for start in range(0, len(paths), 256)]):
+                    self.files.update(chunk)
+        else:
+            for folder in folders:
+                self.files.update(self.read_files(self.list_folder(folder)))
+
+    def list_folder(self, folder):
+        try:
+            items = list(os.scandir(os.path.join(self.root, folder)))
+        except FileNotFoundError:
+            return []
+        return [folder + item.name for item in items if item.name.endswith('.json') and item.is_file()]
+
+    def read_files(self, paths):
+        files = {}
+        for path in paths:
+            with open(os.path.join(self.root, path), 'r', encoding='utf-8') as json_file:
+                files[path] = json_file.read()
+        return files
+
+    def data(self, path):
+        if path not in self.parsed:
+            try:
+                self.parsed[path] = json.loads(self.files[path]) if path in self.files else None
+            except ValueError:
+                self.parsed[path] = None
+        return self.parsed[path]
+
+    def names(self, layout, folder):
+        prefix = self.folder(layout, folder)
+        return sorted(path[len(prefix):-len('.json')] for path in self.files
+                      if path.startswith(prefix) and '/' not in path[len(prefix):])
+
+    def run(self):
+        if self.folder(layouts[self.layout]('_'), 'blockstates') is None:
+            raise ValueError('The {layout} layout has no blockstates to import from'.format(layout=self.layout))
+        options = Options(layout=self.layout, version=self.version)
+        if self.layout == 'flat':
+            self.scan(get_layout(options, None))
+            modid = self.modid or self.infer_modid()
+            layout = get_layout(options, modid)
+        else:
+            modid = self.modid or self.infer_modid()
+            layout = get_layout(options, modid)
+            self.scan(layout)
+
+        lang_folder = self.folder(layout, 'lang')
+        for lang in self.names(layout, 'lang'):
+            table = self.data(lang_folder + lang + '.json')
+            if isinstance(table, dict):
+                for key, text in table.items():
+                    self.langs.setdefault(key, {})[lang] = text
+
+        entries = []
+        blockstates = self.names(layout, 'blockstates')
+        if blockstates:
+            sample = self.files[layout.map('blockstates/' + blockstates[0] + '.json')]
+            self.encoder = JsonEncoder(minify='\n' not in sample.strip())
+        for name in blockstates:
+            entry = self.guess_block(modid, layout, name)
+            if entry is not None and self.verify(modid, layout, entry):
+                entries.append(entry)
+        for name in self.names(layout, 'models/item'):
+            path = layout.map('models/item/' + name + '.json')
+            json_data = self.data(path)
+            if path in self.used or not isinstance(json_data, dict) or json_data.get('parent') != 'item/generated':
+                continue
+            entry = {'parent': 'item/generated', 'name': name, 'lang': self.lang(modid, 'item', name)}
+            if self.verify(modid, layout, entry):
+                entries.append(entry)
+        entries.sort(key=lambda entry: entry.get('name'))
+
+        unmatched = sorted(path for path in self.files if path not in self.used and not path.startswith(lang_folder))
+        for key in sorted(self.langs):
+            if key not in self.used_keys:
+                unmatched.append('{folder}*.json key {key}'.format(folder=lang_folder, key=key))
+        return {'modid': modid, 'entries': entries}, unmatched
+
+    def lang(self, modid, kind, name):
+        return dict(sorted(self.langs.get(kind + '.' + modid + '.' + name, {}).items()))
+
+    def model(self, layout, name):
+        json_data = self.data(layout.map('models/block/' + name + '.json'))
+        return json_data if isinstance(json_data, dict) else {}
+
+    def guess_block(self, modid, layout, name):
+        json_data = self.data(layout.map('blockstates/' + name + '.json'))
+        if not isinstance(json_data, dict):
+            return None
+        variants = json_data.get('variants') or {}
+        textures = json.loads(layout.rewrite(json.dumps(modid + ':blocks/')))
+        if 'multipart' in json_data:
+            parent = 'block/wall'
+            origin = self.model(layout, name + '_inventory').get('textures', {}).get('wall'), textures
+        elif 'type=double' in variants:
+            parent = 'block/slab'
+            origin = variants['type=double'].get('model'), modid + ':block/'
+        elif '' in variants:
+            parent = 'block/cube_all'
+        elif 'facing=north' in variants:
+            parent = 'block/orientable'
+        elif any(variant.startswith('facing=') and 'shape=' in variant for variant in variants):
+            parent = 'block/stairs'
+            origin = self.model(layout, name).get('textures', {}).get('side'), textures
+        else:
+            return None
+        entry = {'parent': parent, 'name': name}
+        if types[parent].uses_origin:
+            identifier, prefix = origin
+            if not isinstance(identifier, str) or not identifier.startswith(prefix):
+                return None
+            entry['origin_block'] = identifier[len(prefix):]
+        entry['lang'] = self.lang(modid, 'block', name)
+        return entry
+
+    def verify(self, modid, layout, entry):
+        outputs, langs = SerialHelper.render(modid, entry, self.encoder)
+        paths = []
+        for path, text in outputs:
+            path = layout.map(path)
+            if path is None:
+                continue
+            text = layout.rewrite(text)
+            if path in self.used or path not in self.files:
+                return False
+            if self.files[path] != text and self.data(path) != json.loads(text):
+                return False
+            paths.append(path)
+        self.used.update(paths)
+        for lang_dict in langs.values():
+            self.used_keys.update(lang_dict)
+        return True
+
+
+def print_warnings(result, duplicates=True, target=''):
+    if duplicates:
+        for duplicate in result.duplicates:
+            print('warning: ' + duplicate, file=sys.stderr)
+    if result.textures is not None:
+        for texture, names in result.textures['missing'].items():
+            print('warning: {target}missing texture {texture} used by {names}'.format(
+                target=target, texture=texture, names=', '.join(names)), file=sys.stderr)
+        for texture in result.textures['unused']:
+            print('warning: {target}unused texture {texture}'.format(target=target, texture=texture),
+                  file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Generate minecraft json files from input.json')
+    parser.add_argument('input', nargs='?', default=SerialHelper.path,
+                        help='input file (default: input.json)')
+    parser.add_argument('-o', '--output', default='.',
+                        help='directory the assets are written to (default: current directory)')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only rewrite files whose inputs changed since the last run')
+    parser.add_argument('--manifest', default='.mc_json_helper_manifest.json',
+                        help='manifest file used by --incremental, relative to the output directory')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes for rendering and threads for writing')
+    parser.add_argument('--encoder', choices=['auto'] + sorted(encoders), default='json',
+                        help='json serializer backend, auto picks orjson when it is installed (default: json)')
+    parser.add_argument('--minify', action='store_true',
+                        help='write compact json for release builds')
+    parser.add_argument('--layout', choices=sorted(layouts), default='flat',
+                        help='flat keeps the models/, blockstates/, loot_tables/ and lang/ folders, '
+                             'the others nest them under assets/<modid> and data/<modid> (default: flat)')
+    parser.add_argument('--game-version', choices=sorted(versions), default=GameVersion.name,
+                        help='1.13 points models at the block/ and item/ texture folders, 1.21 also writes '
+                             'loot tables to loot_table/ (default: blocks/, items/ and loot_tables/)')
+    parser.add_argument('--target', nargs=3, action='append', metavar=('DIR', 'LAYOUT', 'VERSION'),
+                        help='render the input once and write it to DIR with LAYOUT and game VERSION, '
+                             'can be given several times')
+    parser.add_argument('--pack-format', type=int,
+                        help='pack_format written to pack.mcmeta by the resourcepack and datapack layouts '
+                             '(default: the one of --game-version, 6 for the default version)')
+    parser.add_argument('--zip', metavar='ARCHIVE',
+                        help='write everything into this zip archive instead of separate files')
+    parser.add_argument('--compression', choices=sorted(ZipOutput.compressions), default='deflated',
+                        help='compression used for --zip (default: deflated)')
+    parser.add_argument('--compress-level', type=int,
+                        help='compression level used for --zip')
+    parser.add_argument('--profile', action='store_true',
+                        help='print timings and counters per phase and per block class')
+    parser.add_argument('--profile-memory', action='store_true',
+                        help='also take tracemalloc snapshots, implies --profile')
+    parser.add_argument('--profile-output', metavar='FILE',
+                        help='write the profile report as json to FILE, implies --profile')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='plan the run and list the files that would be written without writing anything')
+    parser.add_argument('--no-validate', action='store_true',
+                        help='skip the check of parents, names, lang objects and origin_block references '
+                             'that runs before anything is written')
+    parser.add_argument('--textures', metavar='DIR',
+                        help='textures directory of the mod (holding blocks/ and items/), every texture '
+                             'referenced by a model is checked against it and missing and unused ones are reported')
+    parser.add_argument('--check', action='store_true',
+                        help='render everything in memory and compare it with the files on disk without '
+                             'writing anything, exits with status 1 when they differ')
+    parser.add_argument('--staged', action='store_true',
+                        help='write into a temporary tree next to the output and swap it in at the end, '
+                             'so a failed run leaves the previous output untouched')
+    parser.add_argument('--writer', choices=('sync', 'async'), default='sync',
+                        help='write files one after the other (sync) or hand them in batches to an asyncio loop '
+                             'that writes them on several threads (async), which helps on network filesystems')
+    parser.add_argument('--write-concurrency', type=int, default=32, metavar='N',
+                        help='number of threads the async writer uses, which is the most files it writes at once')
+    parser.add_argument('--input-cache', action='store_true',
+                        help='keep a binary copy of the parsed and validated input next to it and load that '
+                             'instead while the input is unchanged')
+    parser.add_argument('--lang-replace', action='store_true',
+                        help='overwrite existing lang files instead of merging the generated keys into them')
+    parser.add_argument('--lang-spill-keys', type=int, default=None,
+                        help='number of buffered lang keys after which they are sorted and spilled to disk '
+                             '(default {keys})'.format(keys=LangBuilder.spill_keys))
+    parser.add_argument('--stream', action='store_true',
+                        help='write each entry as soon as it is rendered instead of planning the whole run '
+                             'first, uses less memory but cannot detect conflicting outputs up front')
+    parser.add_argument('--import-from', metavar='DIR',
+                        help='rebuild the input file from the blockstates, models, loot tables and lang files '
+                             'in DIR (read with --layout) instead of generating, files that do not match any '
+                             'known shape are listed')
+    parser.add_argument('--modid',
+                        help='modid used by --import-from (default: guessed from DIR)')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='json list of mods to generate in one process, each an input path or '
+                             '{"input": ..., "output": ..., "options": {...}}, spread over --jobs processes')
+    parser.add_argument('--serve', metavar='PORT', type=int,
+                        help='serve the generated files over http on localhost:PORT, rendering them on demand '
+                             'from the input without writing anything')
+    parser.add_argument('--serve-cache', type=int, default=1024,
+                        help='number of rendered entries kept in memory by --serve (default: 1024)')
+    parser.add_argument('--watch', action='store_true',
+                        help='keep running and regenerate the entries that change whenever the input is saved')
+    parser.add_argument('--watch-interval', type=float, default=0.1,
+                        help='seconds between checks of the input file in --watch mode (default: 0.1)')
+    args = parser.parse_args(argv)
+
+    options = Options(incremental=args.incremental, manifest=args.manifest, jobs=args.jobs,
+                      encoder=args.encoder, minify=args.minify, layout=args.layout,
+                      pack_format=args.pack_format, zip=args.zip, compression=args.compression,
+                      compress_level=args.compress_level,
+                      profile=args.profile or bool(args.profile_output), profile_memory=args.profile_memory,
+                      plan=not args.stream, dry_run=args.dry_run,
+                      lang_merge=not args.lang_replace, lang_spill_keys=args.lang_spill_keys,
+                      validate=not args.no_validate, textures=args.textures, check=args.check,
+                      staged=args.staged, input_cache=args.input_cache, writer=args.writer,
+                      write_concurrency=args.write_concurrency, version=args.game_version)
+    if args.batch:
+        try:
+            mods = read_batch(args.batch)
+            results = generate_batch(mods, options)
+        except (ValueError, OSError) as error:
+            parser.exit(1, 'error: {error}\n'.format(error=error))
+        failed = 0
+        for mod, (result, error) in zip(mods, results):
+            input = mod.get('input') if isinstance(mod.get('input'), str) else mod.get('input').get('modid')
+            if error is not None:
+                failed += 1
+                print('error: {input}: {error}'.format(input=input, error=error), file=sys.stderr)
+                continue
+            print('{modid}: {entries} entries, {written} files written, {unchanged} unchanged in {output}'.format(
+                modid=result.modid, entries=result.entries, written=result.files_written,
+                unchanged=result.files_unchanged, output=mod.get('output')))
+        if failed:
+            sys.exit(1)
+        return
+    if args.target:
+        try:
+            results = generate_targets(args.input, read_targets(args.target), options)
+        except (ValueError, OSError) as error:
+            parser.exit(1, 'error: {error}\n'.format(error=error))
+        for index, result in enumerate(results):
+            print_warnings(result, index == 0, result.output_root + ': ')
+        for result in results:
+            print('{modid}: {entries} entries, {written} files written, {unchanged} unchanged in {output}'.format(
+                modid=result.modid, entries=result.entries, written=result.files_written,
+                unchanged=result.files_unchanged, output=result.output_root))
+        if results[0].profile is not None:
+            print(Profiler.format(results[0].profile))
+        return
+    if args.serve is not None:
+        try:
+            DevServer(args.input, options, args.serve_cache).serve(port=args.serve)
+        except (ValueError, OSError) as error:
+            parser.exit(1, 'error: {error}\n'.format(error=error))
+        except KeyboardInterrupt:
+            pass
+        return
+    if args.import_from:
+        if os.path.exists(args.input):
+            parser.exit(1, 'error: {path} already exists\n'.format(path=args.input))
+        try:
+            document, unmatched = Importer(args.import_from, args.layout, args.modid, args.jobs,
+                                           args.game_version).run()
+        except (ValueError, OSError) as error:
+            parser.exit(1, 'error: {error}\n'.format(error=error))
+        with open(args.input, 'w', encoding='utf-8') as json_file:
+            json_file.write(JsonEncoder().dumps(document))
+        for path in unmatched:
+            print('warning: not matched ' + path, file=sys.stderr)
+        print('{modid}: {entries} entries imported to {path}, {unmatched} not matched'.format(
+            modid=document.get('modid'), entries=len(document.get('entries')), path=args.input,
+            unmatched=len(unmatched)))
+        return
+    if args.watch:
+        try:
+            Watcher(args.input, args.output, options, args.watch_interval).run()
+        except (ValueError, OSError) as error:
+            parser.exit(1, 'error: {error}\n'.format(error=error))
+        except KeyboardInterrupt:
+            pass
+        return
+    try:
+        result = generate(args.input, args.output, options)
+    except (ValueError, OSError) as error:
+        parser.exit(1, 'error: {error}\n'.format(error=error))
+    print_warnings(result)
+    if result.planned is not None:
+        for path, size, changed in result.planned:
+            print('{action:<9} {path} ({size} bytes)'.format(
+                action='write' if changed else 'unchanged', path=path, size=size))
+    if result.drift is not None:
+        for status, path, lines in result.drift:
+            print('{status:<9} {path}'.format(status=status, path=path))
+            for line in lines:
+                print('    ' + line)
+        print('{modid}: {entries} entries, {unchanged} files up to date, {drift} out of date'.format(
+            modid=result.modid, entries=result.entries, unchanged=result.files_unchanged,
+            drift=len(result.drift)))
     else:
-        types.get(parent)(modid, name, langs_dict)
-    print(langs_dict)
+        print('{modid}: {entries} entries, {written} files {action}, {unchanged} unchanged{deleted}'.format(
+            modid=result.modid, entries=result.entries, action='to write' if options.dry_run else 'written',
+            written=result.files_written, unchanged=result.files_unchanged,
+            deleted=', {count} deleted'.format(count=result.files_deleted) if result.files_deleted else ''))
+    if result.profile is not None:
+        print(Profiler.format(result.profile))
+        if args.profile_output:
+            with open(args.profile_output, 'w') as json_file:
+                json.dump(result.profile, json_file, indent=2)
+    if result.drift:
+        sys.exit(1)
+
 
-SerialHelper.write_lang_file()
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class CheckTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(ROOT, 'input.json')
+        mc_json_helper.generate(self.input, self.root, mc_json_helper.Options())
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def check(self):
+        return mc_json_helper.generate(self.input, self.root, mc_json_helper.Options(check=True)).drift
+
+    def test_up_to_date(self):
+        self.assertEqual([], self.check())
+
+    def test_stray_lang_file(self):
+        with open(os.path.join(self.root, 'lang', 'de_de.json'), 'w') as json_file:
+            json_file.write('{}')
+        self.assertEqual([('extra', 'lang/de_de.json', [])], self.check())
+
+
+if __name__ == '__main__':
+    unittest.main()
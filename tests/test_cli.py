@@ -0,0 +1,40 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr
+from io import StringIO
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(ROOT, 'input.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def assertError(self, *argv):
+        stderr = StringIO()
+        with redirect_stderr(stderr), self.assertRaises(SystemExit) as context:
+            mc_json_helper.main(list(argv))
+        self.assertEqual(1, context.exception.code)
+        self.assertTrue(stderr.getvalue().startswith('error: '), stderr.getvalue())
+
+    def test_errors(self):
+        output = os.path.join(self.root, 'out')
+        self.assertError(self.input, '-o', output, '--dry-run', '--stream')
+        self.assertError(self.input, '-o', output, '--incremental', '--zip', 'pack.zip')
+        self.assertError(self.input, '-o', output, '--staged', '--zip', 'pack.zip')
+        self.assertError(self.input, '--target', output, 'mod', 'default', '--target', output, 'mod', '1.13')
+        self.assertError(os.path.join(self.root, 'missing.json'), '-o', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
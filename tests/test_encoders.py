@@ -0,0 +1,55 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class EncoderTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def render(self, encoder, minify=False):
+        output_root = os.path.join(self.root, encoder + ('_minify' if minify else ''))
+        options = mc_json_helper.Options(encoder=encoder, minify=minify)
+        mc_json_helper.generate(os.path.join(ROOT, 'input.json'), output_root, options)
+        files = {}
+        for dir, dirs, names in os.walk(output_root):
+            for name in names:
+                path = os.path.join(dir, name)
+                with open(path, 'r', encoding='utf-8') as json_file:
+                    files[os.path.relpath(path, output_root)] = json_file.read()
+        return files
+
+    def assertSameJson(self, expected, actual):
+        self.assertEqual(sorted(expected), sorted(actual))
+        for path, text in expected.items():
+            self.assertEqual(json.loads(text), json.loads(actual[path]), path)
+
+    def test_minify(self):
+        pretty = self.render('json')
+        minified = self.render('json', minify=True)
+        self.assertSameJson(pretty, minified)
+        for path, text in minified.items():
+            self.assertNotIn('\n', text.strip(), path)
+
+    @unittest.skipIf(mc_json_helper.orjson is None, 'orjson is not installed')
+    def test_orjson(self):
+        self.assertSameJson(self.render('json'), self.render('orjson'))
+
+    @unittest.skipIf(mc_json_helper.orjson is None, 'orjson is not installed')
+    def test_orjson_minify(self):
+        self.assertSameJson(self.render('json'), self.render('orjson', minify=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class IncrementalTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(self.root, 'input.json')
+        self.output_root = os.path.join(self.root, 'out')
+        self.entries = [
+            {'parent': 'block/cube_all', 'name': 'a', 'lang': {'en_us': 'A'}},
+            {'parent': 'block/stairs', 'name': 's', 'origin_block': 'a', 'lang': {'en_us': 'S'}}
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def generate(self):
+        with open(self.input, 'w') as json_file:
+            json.dump({'modid': 'testid', 'entries': self.entries}, json_file)
+        return mc_json_helper.generate(self.input, self.output_root, mc_json_helper.Options(incremental=True))
+
+    def read(self, path):
+        with open(os.path.join(self.output_root, path), 'r', encoding='utf-8') as json_file:
+            return json_file.read()
+
+    def test_conflict_with_reused_entry(self):
+        self.generate()
+        inner = self.read('models/block/s_inner.json')
+        self.entries.append({'parent': 'block/cube_all', 'name': 's_inner', 'lang': {'en_us': 'Inner'}})
+        with self.assertRaises(mc_json_helper.PlanError) as context:
+            self.generate()
+        self.assertIn('models/block/s_inner.json', str(context.exception))
+        self.assertEqual(inner, self.read('models/block/s_inner.json'))
+
+    def test_same_size_edit_is_repaired(self):
+        self.generate()
+        path = os.path.join(self.output_root, 'models/block/a.json')
+        text = self.read('models/block/a.json')
+        with open(path, 'w', encoding='utf-8') as json_file:
+            json_file.write(text.replace('blocks/a', 'blocks/b'))
+        os.utime(path, ns=(0, 0))
+        result = self.generate()
+        self.assertEqual(text, self.read('models/block/a.json'))
+        self.assertEqual(1, result.files_written)
+        self.assertEqual(0, self.generate().files_written)
+
+
+if __name__ == '__main__':
+    unittest.main()
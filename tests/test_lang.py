@@ -0,0 +1,58 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class LangMergeTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(self.root, 'input.json')
+        self.output_root = os.path.join(self.root, 'out')
+        with open(os.path.join(ROOT, 'input.json'), 'r') as json_file:
+            self.data = json.load(json_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def generate(self, **options):
+        with open(self.input, 'w') as json_file:
+            json.dump(self.data, json_file)
+        mc_json_helper.generate(self.input, self.output_root, mc_json_helper.Options(**options))
+
+    def en_us(self):
+        with open(os.path.join(self.output_root, 'lang', 'en_us.json'), 'r', encoding='utf-8') as json_file:
+            return json.load(json_file)
+
+    def write_en_us(self, lang_dict):
+        with open(os.path.join(self.output_root, 'lang', 'en_us.json'), 'w', encoding='utf-8') as json_file:
+            json.dump(lang_dict, json_file)
+
+    def rename_and_regenerate(self, **options):
+        self.generate(**options)
+        self.write_en_us(dict(self.en_us(), **{'custom.key': 'Hand written'}))
+        for entry in self.data['entries']:
+            if entry['name'] == 'saske_item':
+                entry['name'] = 'sasuke_item'
+        self.generate(**options)
+        lang = self.en_us()
+        self.assertNotIn('item.exampleid.saske_item', lang)
+        self.assertIn('item.exampleid.sasuke_item', lang)
+        self.assertEqual('Hand written', lang['custom.key'])
+
+    def test_renamed_entry(self):
+        self.rename_and_regenerate()
+
+    def test_renamed_entry_spilled(self):
+        self.rename_and_regenerate(plan=False, jobs=2, lang_spill_keys=2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class StagedTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(self.root, 'input.json')
+        self.output_root = os.path.join(self.root, 'out')
+        with open(os.path.join(ROOT, 'input.json'), 'r') as json_file:
+            self.data = json.load(json_file)
+        self.generate()
+        self.previous = os.path.join(self.root, 'previous')
+        shutil.copytree(self.output_root, self.previous)
+        self.data['entries'][0]['name'] = 'renamed_block'
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def generate(self, output_root=None, staged=True):
+        with open(self.input, 'w') as json_file:
+            json.dump(self.data, json_file)
+        mc_json_helper.generate(self.input, output_root or self.output_root, mc_json_helper.Options(staged=staged))
+
+    def tree(self, root):
+        files = {}
+        for dir, dirs, names in os.walk(root):
+            for name in names:
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(dir, name)
+                with open(path, 'r', encoding='utf-8') as json_file:
+                    files[os.path.relpath(path, root)] = json_file.read()
+        return files
+
+    def fail_rename(self, count):
+        rename = os.rename
+        calls = []
+
+        def failing(source, target):
+            calls.append(source)
+            if len(calls) == count:
+                raise OSError('rename failed')
+            rename(source, target)
+        return mock.patch('os.rename', failing)
+
+    def expected(self):
+        expected_root = os.path.join(self.root, 'expected')
+        shutil.copytree(self.previous, expected_root)
+        self.generate(expected_root, staged=False)
+        return self.tree(expected_root)
+
+    def test_failed_swap_is_finished(self):
+        with self.fail_rename(4):
+            with self.assertRaises(OSError):
+                self.generate()
+        self.assertEqual(self.expected(), self.tree(self.output_root))
+
+    def test_killed_swap_is_finished_by_next_run(self):
+        with self.fail_rename(4), mock.patch.object(mc_json_helper.StagedOutput, 'close'):
+            with self.assertRaises(OSError):
+                self.generate()
+        self.assertTrue(os.path.isdir(os.path.join(self.output_root, mc_json_helper.StagedOutput.stage_name)))
+        mc_json_helper.StagedOutput.recover(self.output_root)
+        self.assertEqual(self.expected(), self.tree(self.output_root))
+
+
+if __name__ == '__main__':
+    unittest.main()
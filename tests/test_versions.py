@@ -0,0 +1,48 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class GameVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(ROOT, 'input.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def pack_format(self, layout, version, **options):
+        output_root = os.path.join(self.root, layout + version)
+        mc_json_helper.generate(self.input, output_root,
+                                mc_json_helper.Options(layout=layout, version=version, **options))
+        with open(os.path.join(output_root, 'pack.mcmeta'), 'r') as json_file:
+            return json.load(json_file)['pack']['pack_format']
+
+    def test_pack_format(self):
+        self.assertEqual(6, self.pack_format('resourcepack', 'default'))
+        self.assertEqual(4, self.pack_format('resourcepack', '1.13'))
+        self.assertEqual(34, self.pack_format('resourcepack', '1.21'))
+        self.assertEqual(48, self.pack_format('datapack', '1.21'))
+        self.assertEqual(15, self.pack_format('datapack', '1.13', pack_format=15))
+
+    def test_import(self):
+        for version in ('1.13', '1.21'):
+            output_root = os.path.join(self.root, version)
+            mc_json_helper.generate(self.input, output_root, mc_json_helper.Options(layout='mod', version=version))
+            document, unmatched = mc_json_helper.Importer(output_root, 'mod', version=version).run()
+            with open(self.input, 'r') as json_file:
+                expected = json.load(json_file)
+            self.assertEqual([], unmatched)
+            self.assertEqual(sorted(expected['entries'], key=lambda entry: entry['name']), document['entries'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import mc_json_helper  # noqa: E402
+
+
+class WatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix='mc_json_helper_test_')
+        self.input = os.path.join(self.root, 'input.json')
+        self.output_root = os.path.join(self.root, 'out')
+        self.entries = [
+            {'parent': 'block/cube_all', 'name': 'a', 'lang': {'en_us': 'A'}},
+            {'parent': 'block/stairs', 'name': 's', 'origin_block': 'a', 'lang': {'en_us': 'S'}}
+        ]
+        self.save()
+        self.watcher = mc_json_helper.Watcher(self.input, self.output_root)
+        self.watcher.build()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def save(self):
+        with open(self.input, 'w') as json_file:
+            json.dump({'modid': 'testid', 'entries': self.entries}, json_file)
+
+    def read(self, path):
+        with open(os.path.join(self.output_root, path), 'r', encoding='utf-8') as json_file:
+            return json_file.read()
+
+    def test_rename(self):
+        self.entries[0]['name'] = 'b'
+        self.entries[1]['origin_block'] = 'b'
+        self.save()
+        self.watcher.update()
+        self.assertFalse(os.path.exists(os.path.join(self.output_root, 'models/block/a.json')))
+        self.assertIn('testid:blocks/b', self.read('models/block/s.json'))
+
+    def test_conflict(self):
+        inner = self.read('models/block/s_inner.json')
+        self.entries.append({'parent': 'block/cube_all', 'name': 's_inner', 'lang': {'en_us': 'Inner'}})
+        self.save()
+        with self.assertRaises(mc_json_helper.PlanError):
+            self.watcher.update()
+        self.assertEqual(inner, self.read('models/block/s_inner.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()